@@ -3,10 +3,27 @@ import pandas as pd
 import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
-from datetime import datetime, timedelta
-import io
-import openpyxl
+from datetime import datetime
+import functools
 import time
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from idc_cache import LRUCache, content_hash, frame_fingerprint, frame_nbytes
+from idc_charts import (MAX_POINTS_PER_TRACE, WEBGL_POINT_THRESHOLD, figure_nbytes, lttb_indices, scatter_trace,
+                        theme_color, use_webgl)
+from idc_engine import (DEFAULT_SPEC, DERIVED_COLUMNS, FORECAST_HORIZON, FORECAST_LOOKBACK, FORECAST_METRICS,
+                        INTERVAL_LEVEL, METRIC_COLUMNS, RISK_RULES, SENSITIVITY_SAMPLES, MissingColumnsError,
+                        ScoringSpec, ScoringSpecError, append_scores, concat_frames, evaluate_risks, forecast_all,
+                        forecast_dates, forecast_intervals, join_results, risk_masks, sample_weights, score_frame,
+                        site_risk_counts, summarize_sites, weight_sensitivity)
+from idc_io import (CSV_COMPRESSION_SUFFIXES, csv_compressions, read_dataset, to_csv_bytes, to_parquet_bytes,
+                    write_excel_report)
+from idc_metrics import MetricsRegistry, StageTimer, append_jsonl
+from idc_profile import APPROX_SUMMARY_ROWS, SUMMARY_INDEX, StreamingSummary, profile_dataset
+from idc_report import build_report_bundle
+from idc_synth import sample_data
 
 # 设置页面 - 优化布局和主题
 st.set_page_config(
@@ -19,6 +36,11 @@ st.set_page_config(
     }
 )
 
+# 本次重跑的分阶段计时
+timer = StageTimer()
+# 整页重跑计时进行中；脚本末尾记录后置为False，之后的区块局部重跑由 timed_fragment 单独计时
+timing_active = True
+
 # 自定义样式 - 现代化UI设计升级
 st.markdown("""
 <style>
@@ -292,17 +314,304 @@ if 'results' not in st.session_state:
     st.session_state.results = None
 if 'analysis_complete' not in st.session_state:
     st.session_state.analysis_complete = False
+if 'data_key' not in st.session_state:
+    st.session_state.data_key = None
+if 'appended_keys' not in st.session_state:
+    st.session_state.appended_keys = []
+# 基础数据集版本，每次替换基础数据时递增，追加数据上传控件随之重建，旧的追加文件不会并入新数据
+if 'base_version' not in st.session_state:
+    st.session_state.base_version = 0
 if 'last_updated' not in st.session_state:
     st.session_state.last_updated = datetime.now().strftime("%Y-%m-%d %H:%M")
 
-# 全局权重定义
-weights = {
-    '资源利用': 0.25,
-    '客户健康': 0.25,
-    '财务健康': 0.20,
-    '风险控制': 0.15,
-    '增长潜力': 0.15
-}
+if 'scoring_spec' not in st.session_state:
+    st.session_state.scoring_spec = DEFAULT_SPEC
+
+# 当前评分规则及其维度权重
+scoring_spec = st.session_state.scoring_spec
+weights = dict(scoring_spec.weights)
+
+# 上传文件解析、预测结果、图表降采样与图表对象缓存的内存预算
+UPLOAD_CACHE_BYTES = 512 * 1024 * 1024
+FORECAST_CACHE_BYTES = 128 * 1024 * 1024
+CHART_CACHE_BYTES = 64 * 1024 * 1024
+FIGURE_CACHE_BYTES = 64 * 1024 * 1024
+EXPORT_CACHE_BYTES = 256 * 1024 * 1024
+
+# 进程级上传解析缓存，以文件内容哈希为键，同一文件只解析一次
+@st.cache_resource
+def get_upload_cache():
+    return LRUCache(UPLOAD_CACHE_BYTES)
+
+# 性能指标导出路径，供运维采集（Prometheus textfile / JSON lines）
+METRICS_PROM_FILE = os.environ.get('IDC_METRICS_PROM_FILE')
+METRICS_JSONL_FILE = os.environ.get('IDC_METRICS_JSONL_FILE')
+
+@st.cache_resource
+def get_metrics_registry():
+    return MetricsRegistry()
+
+# 记录一次重跑（整页或局部区块）的各阶段耗时，并按配置写出
+def record_rerun(run_timer, page):
+    registry = get_metrics_registry()
+    record = registry.record(run_timer, page)
+    if METRICS_PROM_FILE:
+        registry.write_prometheus(METRICS_PROM_FILE)
+    if METRICS_JSONL_FILE:
+        append_jsonl(METRICS_JSONL_FILE, record)
+    return record
+
+# 可局部重跑的页面区块：局部重跑时换用新的计时器并以“页面/区块”为标签记录，
+# 整页重跑或外层区块重跑中执行时计入外层计时
+def timed_fragment(label):
+    def decorate(func):
+        @functools.wraps(func)
+        def run(*args, **kwargs):
+            scope = func.__globals__
+            if scope['timing_active']:
+                return func(*args, **kwargs)
+            fragment_timer = StageTimer()
+            scope['timer'], scope['timing_active'] = fragment_timer, True
+            try:
+                return func(*args, **kwargs)
+            finally:
+                scope['timing_active'] = False
+                record_rerun(fragment_timer, f"{scope['page_nav']}/{label}")
+        return st.fragment(run)
+    return decorate
+
+# 跨会话共享的评分结果：同一上传文件在相同评分规则下只评分一次，各会话引用同一份结果
+# 设置 IDC_SHARED_DATASETS=0 可关闭，改为每个会话单独评分
+SHARED_DATASETS = os.environ.get('IDC_SHARED_DATASETS', '1') != '0'
+DATASET_STORE_BYTES = 1024 * 1024 * 1024
+
+# 结果引用的输入数据列可能已被上传缓存淘汰、只由本条目持有，按整个结果表（含站点类别列）计入占用，
+# 另加汇总表与各站点行位置
+def scored_nbytes(entry):
+    return (frame_nbytes(entry['results']) + frame_nbytes(entry['site_summary'])
+            + sum(rows.nbytes for rows in entry['site_rows'].values()))
+
+@st.cache_resource
+def get_dataset_store():
+    return LRUCache(DATASET_STORE_BYTES, sizeof=scored_nbytes)
+
+# 计算健康度并按数据中心汇总最新值与环比，结果只新增派生列并引用输入数据列
+def score_dataset(data):
+    results = join_results(data, score_frame(data, spec=scoring_spec))
+    site_summary, site_rows = summarize_sites(results)
+    return {'results': results, 'site_summary': site_summary, 'site_rows': site_rows,
+            'results_key': frame_fingerprint(results)}
+
+def run_analysis():
+    data = st.session_state.data
+    if SHARED_DATASETS and st.session_state.data_key and not st.session_state.appended_keys:
+        key = (st.session_state.data_key, scoring_spec.key)
+        entry = get_dataset_store().get_or_create(key, lambda: score_dataset(data))
+    else:
+        entry = score_dataset(data)
+    st.session_state.update(entry)
+    st.session_state.results_spec = scoring_spec.key
+    st.session_state.analysis_complete = True
+
+def results_stale():
+    return not st.session_state.analysis_complete or st.session_state.get('results_spec') != scoring_spec.key
+
+# 仅在数据或评分规则变化后重新计算
+def ensure_results():
+    if results_stale():
+        with timer.stage('score'):
+            run_analysis()
+    return st.session_state.results
+
+# 追加新月份数据，已有结果有效时只对新增行评分
+def append_data(new_rows):
+    data = st.session_state.data
+    if list(new_rows.columns) != list(data.columns):
+        raise ValueError("追加数据的列与现有数据不一致")
+    st.session_state.data = concat_frames([data, new_rows])
+    get_data_profile()
+    
+    merged = None
+    if st.session_state.analysis_complete and st.session_state.get('results_spec') == scoring_spec.key:
+        with timer.stage('score'):
+            merged = append_scores(st.session_state.results, st.session_state.site_summary,
+                                   st.session_state.site_rows, new_rows, spec=scoring_spec)
+    if merged is None:
+        # 历史月份发生变化或尚无结果，下次访问时全量重算
+        st.session_state.analysis_complete = False
+    else:
+        combined, st.session_state.site_summary, st.session_state.site_rows = merged
+        st.session_state.results = join_results(st.session_state.data, combined[DERIVED_COLUMNS])
+        st.session_state.results_key = content_hash(
+            (st.session_state.results_key + frame_fingerprint(new_rows)).encode())
+
+# 进程级预测缓存，以结果指纹、回归窗口和预测周期为键
+@st.cache_resource
+def get_forecast_cache():
+    return LRUCache(FORECAST_CACHE_BYTES)
+
+# 所有站点、所有可预测指标的批量预测
+def get_forecasts(lookback):
+    key = (st.session_state.results_key, lookback, FORECAST_HORIZON)
+    return get_forecast_cache().get_or_create(key, lambda: forecast_all(
+        st.session_state.results, st.session_state.site_rows, lookback=lookback, horizon=FORECAST_HORIZON))
+
+# 数据质量报告随数据集保存，数据导入或追加后扫描一次，页面重跑只读取已有报告
+def get_data_profile():
+    if st.session_state.get('profile_source') is not st.session_state.data:
+        st.session_state.data_profile = profile_dataset(st.session_state.data)
+        st.session_state.profile_source = st.session_state.data
+    return st.session_state.data_profile
+
+# 数据预览的摘要统计，每个数据集计算一次；大数据集的分位数使用导入时逐块构建的草图近似
+def store_data_summary(sketch=None):
+    data = st.session_state.data
+    if len(data) > APPROX_SUMMARY_ROWS:
+        if sketch is None or sketch.rows != len(data):
+            sketch = StreamingSummary().update(data)
+        describe = sketch.describe()
+    else:
+        # 含日期列时 pandas 把 std 排在最后，统一为与草图一致的行顺序
+        sketch, describe = None, data.describe().reindex(SUMMARY_INDEX)
+    st.session_state.data_summary = {'describe': describe, 'sketch': sketch}
+    st.session_state.summary_source = data
+
+def get_data_summary():
+    if st.session_state.get('summary_source') is not st.session_state.data:
+        store_data_summary()
+    return st.session_state.data_summary
+
+# 全部历史行的风险规则掩码，结果变化后重新求值一次
+def get_risk_masks():
+    if st.session_state.get('risk_key') != st.session_state.results_key:
+        st.session_state.risk_masks = risk_masks(st.session_state.results)
+        st.session_state.risk_key = st.session_state.results_key
+    return st.session_state.risk_masks
+
+# 所选站点各指标的自助法预测区间，按需计算并与点预测共用缓存
+def get_forecast_intervals(site, lookback):
+    key = (st.session_state.results_key, 'interval', site, lookback, FORECAST_HORIZON)
+    return get_forecast_cache().get_or_create(key, lambda: forecast_intervals(
+        st.session_state.results, {site: st.session_state.site_rows[site]}, lookback=lookback,
+        horizon=FORECAST_HORIZON))
+
+# 所有站点、所有月份在抽样权重下的等级概率与总分分布，与预测共用缓存
+def get_weight_sensitivity(n_samples, concentration):
+    key = (st.session_state.results_key, 'sensitivity', n_samples, concentration)
+    W = sample_weights(n_samples, weights, concentration)
+    return W, get_forecast_cache().get_or_create(key, lambda: weight_sensitivity(
+        st.session_state.results, W, scoring_spec))
+
+# 进程级图表降采样缓存，保存每条序列的选点位置
+@st.cache_resource
+def get_chart_cache():
+    return LRUCache(CHART_CACHE_BYTES, sizeof=lambda indices: indices.nbytes)
+
+# 趋势曲线降采样：按所选时间范围切片后以LTTB限制点数，范围越窄保留的细节越多
+def downsample_series(df, site, column, time_range):
+    months = df['月份'].to_numpy()
+    start = int(np.searchsorted(months, np.datetime64(time_range[0]), 'left'))
+    stop = int(np.searchsorted(months, np.datetime64(time_range[1]), 'right'))
+    key = (st.session_state.results_key, site, column, start, stop, MAX_POINTS_PER_TRACE)
+    indices = get_chart_cache().get_or_create(key, lambda: start + lttb_indices(
+        months[start:stop].view('int64'), df[column].to_numpy()[start:stop], MAX_POINTS_PER_TRACE))
+    return df['月份'].iloc[indices], df[column].iloc[indices]
+
+# 进程级图表对象缓存，数据版本、站点与视图参数均未变化时复用已构建的图表
+@st.cache_resource
+def get_figure_cache():
+    return LRUCache(FIGURE_CACHE_BYTES, sizeof=figure_nbytes)
+
+def cached_figure(name, params, build):
+    key = (st.session_state.results_key, name, params)
+    return get_figure_cache().get_or_create(key, build)
+
+# 进程级导出文件缓存，以结果指纹与导出设置为键，数据不变时重复下载直接复用
+@st.cache_resource
+def get_export_cache():
+    return LRUCache(EXPORT_CACHE_BYTES, sizeof=len)
+
+# 导出文件在点击下载时才生成，回调中不能访问会话状态，所需参数在渲染时绑定
+def lazy_export(key, build):
+    export_cache = get_export_cache()
+    return lambda: export_cache.get_or_create(key, build)
+
+# 导出任务在后台线程写入临时文件，页面不等待生成完成
+# write(path, progress) 写出文件，progress(已完成数, 总数) 报告进度
+@st.cache_resource
+def get_export_executor():
+    return ThreadPoolExecutor(max_workers=2, thread_name_prefix='idc-export')
+
+def run_export_job(write, path, status):
+    start = time.perf_counter()
+    write(path, lambda done, total: status.update(done=done, total=total))
+    status['seconds'] = time.perf_counter() - start
+
+# 导出任务文件统一放在临时目录下的子目录，超过保留时间的文件在新任务开始时清理
+EXPORT_DIR = Path(tempfile.gettempdir()) / 'idc_exports'
+EXPORT_FILE_TTL = 3600
+
+def sweep_export_files():
+    cutoff = time.time() - EXPORT_FILE_TTL
+    for path in EXPORT_DIR.glob('idc_report_*'):
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+        except OSError:
+            pass
+
+def start_export_job(name, key, write, suffix, total):
+    job = st.session_state.get(name)
+    if job is not None:
+        future = job['future']
+        # 相同设置的任务在进行中或已成功时直接复用
+        if job['key'] == key and not (future.done() and future.exception() is not None):
+            return
+        # 旧任务未开始则取消，否则结束后删除其临时文件
+        future.cancel()
+        future.add_done_callback(lambda _, path=job['path']: Path(path).unlink(missing_ok=True))
+    sweep_export_files()
+    EXPORT_DIR.mkdir(exist_ok=True)
+    fd, path = tempfile.mkstemp(prefix='idc_report_', suffix=suffix, dir=EXPORT_DIR)
+    os.close(fd)
+    status = {'done': 0, 'total': total}
+    future = get_export_executor().submit(run_export_job, write, path, status)
+    st.session_state[name] = {'key': key, 'path': path, 'future': future, 'status': status}
+
+# 后台导出状态：生成中显示进度并定时刷新，完成后提供下载
+def show_export_job(name, key, polling, label, file_name, mime, progress_text, error_text):
+    job = st.session_state.get(name)
+    if job is None or job['key'] != key:
+        return
+    future, status = job['future'], job['status']
+    if not future.done():
+        st.progress(status['done'] / status['total'] if status['total'] else 0.0,
+                    text=progress_text.format(done=status['done'], total=status['total']))
+    elif polling:
+        # 生成完成后整页重跑一次，停止定时刷新
+        st.rerun()
+    elif future.exception() is not None:
+        st.error(f"{error_text}: {str(future.exception())}")
+    elif not Path(job['path']).exists():
+        # 文件已超过保留时间被清理，需重新生成
+        del st.session_state[name]
+    else:
+        st.download_button(label=label, data=lambda path=job['path']: Path(path).read_bytes(),
+                           file_name=file_name, mime=mime, on_click='ignore', use_container_width=True)
+        st.caption(f"生成耗时 {status['seconds']:.1f} 秒")
+
+def export_job_status(name, key, **options):
+    job = st.session_state.get(name)
+    polling = job is not None and job['key'] == key and not job['future'].done()
+    st.fragment(show_export_job, run_every=1 if polling else None)(name, key, polling, **options)
+
+# 数据中心选择，返回所选站点的历史数据与最新汇总
+def select_site():
+    summary = st.session_state.site_summary
+    site = summary.index[0]
+    if len(summary) > 1:
+        site = st.selectbox("选择数据中心", summary.index, key='selected_site')
+    return st.session_state.results.iloc[st.session_state.site_rows[site]], summary.loc[site]
 
 # 页面标题与说明
 st.markdown("<h1 class='header-text'>IDC资源销售健康度测评辅助工具</h1>", unsafe_allow_html=True)
@@ -311,28 +620,13 @@ st.caption("全面评估数据中心资源销售健康状况，精准识别风
 # 使用查询参数示例
 params = st.query_params
 if 'demo' in params and params['demo'] == 'true' and st.session_state.data is None:
-    with st.spinner("检测到演示模式参数，正在加载示例数据..."):
-        time.sleep(1)
+    with st.spinner("检测到演示模式参数，正在加载示例数据..."), timer.stage('ingest'):
         # 生成示例数据
-        dates = pd.date_range(start='2023-01-01', periods=12, freq='M')
-        data = {
-            '月份': dates,
-            '服务器利用率': [68, 72, 75, 78, 82, 80, 77, 79, 83, 85, 88, 90],
-            '带宽利用率': [65, 68, 72, 75, 78, 76, 72, 74, 77, 80, 84, 86],
-            '机柜利用率': [75, 78, 82, 85, 88, 86, 83, 84, 87, 89, 91, 93],
-            '新客户数量': [8, 10, 12, 14, 16, 13, 11, 15, 18, 20, 23, 25],
-            '客户流失率': [5.2, 4.8, 4.5, 4.2, 3.8, 4.1, 4.3, 3.9, 3.6, 3.3, 3.0, 2.7],
-            '平均合同期限': [16, 18, 20, 22, 24, 23, 21, 23, 25, 27, 29, 31],
-            '月收入(万元)': [120, 140, 160, 180, 200, 190, 175, 195, 210, 225, 240, 255],
-            '利润率': [25, 27, 29, 31, 33, 32, 30, 32, 34, 36, 38, 40],
-            '应收账款周转天数': [60, 58, 55, 52, 48, 50, 53, 49, 46, 43, 40, 37],
-            '高风险客户占比': [15, 14, 13, 12, 11, 12, 13, 11, 10, 9, 8, 7],
-            '服务中断次数': [3, 3, 2, 2, 1, 2, 2, 1, 1, 0, 0, 0],
-            '市场增长率': [1.2, 1.5, 1.8, 2.0, 2.3, 2.1, 1.9, 2.2, 2.5, 2.7, 3.0, 3.2],
-            '销售漏斗数量': [35, 40, 45, 50, 55, 52, 48, 58, 65, 72, 80, 88]
-        }
-        st.session_state.data = pd.DataFrame(data)
+        st.session_state.data = sample_data()
+        st.session_state.appended_keys = []
+        st.session_state.base_version += 1
         st.session_state.analysis_complete = False
+        get_data_profile()
         st.success("示例数据已加载完成！")
 
 # 侧边栏配置
@@ -369,15 +663,51 @@ with st.sidebar:
           市场拓展速度、销售机会储备分析
         """)
     
+    with st.expander("⚙️ 图表设置"):
+        webgl_threshold = st.number_input(
+            "WebGL渲染阈值（点数）",
+            min_value=0,
+            value=WEBGL_POINT_THRESHOLD,
+            step=1000,
+            key='webgl_threshold',
+            help="单个趋势图的总点数超过该值时改用WebGL渲染，0表示始终使用WebGL"
+        )
+    
+    with st.expander("📐 评分规则"):
+        st.caption(f"当前规则：{scoring_spec.name} v{scoring_spec.version}")
+        spec_file = st.file_uploader("导入评分规则 (JSON)", type=['json'], key='spec_file')
+        if spec_file is not None and st.session_state.get('spec_file_id') != spec_file.file_id:
+            st.session_state.spec_file_id = spec_file.file_id
+            try:
+                st.session_state.scoring_spec = ScoringSpec.load(spec_file)
+                st.rerun()
+            except ScoringSpecError as e:
+                st.error(str(e))
+        st.download_button(
+            label="下载当前评分规则",
+            data=scoring_spec.to_json().encode('utf-8'),
+            file_name=f"评分规则_{scoring_spec.version}.json",
+            mime='application/json',
+            use_container_width=True
+        )
+        if scoring_spec is not DEFAULT_SPEC and st.button("恢复默认评分规则", use_container_width=True):
+            st.session_state.scoring_spec = DEFAULT_SPEC
+            st.rerun()
+    
     st.markdown("---")
     st.markdown("**数据质量检查**")
     if st.session_state.data is not None:
-        missing_data = st.session_state.data.isnull().sum().sum()
-        if missing_data > 0:
-            st.error(f"发现{missing_data}处缺失值")
-            st.warning("建议清理缺失数据以获得更准确的分析结果")
+        data_profile = get_data_profile()
+        if data_profile['issues']:
+            for level, message in data_profile['issues']:
+                (st.error if level == 'error' else st.warning)(message)
+            st.warning("建议清理问题数据以获得更准确的分析结果")
         else:
             st.success("✅ 数据完整无缺失")
+        with st.expander("数据质量明细"):
+            st.caption(f"共 {data_profile['rows']:,} 行，重复月份 {data_profile['duplicate_months']} 条，"
+                       f"月份倒序 {data_profile['unordered_months']} 处")
+            st.dataframe(data_profile['columns'], use_container_width=True)
     
     st.markdown("---")
     st.info("**使用提示**")
@@ -405,115 +735,118 @@ if page_nav == "数据导入":
             st.info("快速生成模拟数据进行分析演示，包含12个月的完整指标")
             
             if st.button("生成示例数据", use_container_width=True, type="primary"):
-                with st.spinner("正在生成示例数据..."):
+                with st.spinner("正在生成示例数据..."), timer.stage('ingest'):
                     # 生成更全面的示例数据
-                    dates = pd.date_range(start='2023-01-01', periods=12, freq='M')
-                    data = {
-                        '月份': dates,
-                        '服务器利用率': [68, 72, 75, 78, 82, 80, 77, 79, 83, 85, 88, 90],
-                        '带宽利用率': [65, 68, 72, 75, 78, 76, 72, 74, 77, 80, 84, 86],
-                        '机柜利用率': [75, 78, 82, 85, 88, 86, 83, 84, 87, 89, 91, 93],
-                        '新客户数量': [8, 10, 12, 14, 16, 13, 11, 15, 18, 20, 23, 25],
-                        '客户流失率': [5.2, 4.8, 4.5, 4.2, 3.8, 4.1, 4.3, 3.9, 3.6, 3.3, 3.0, 2.7],
-                        '平均合同期限': [16, 18, 20, 22, 24, 23, 21, 23, 25, 27, 29, 31],
-                        '月收入(万元)': [120, 140, 160, 180, 200, 190, 175, 195, 210, 225, 240, 255],
-                        '利润率': [25, 27, 29, 31, 33, 32, 30, 32, 34, 36, 38, 40],
-                        '应收账款周转天数': [60, 58, 55, 52, 48, 50, 53, 49, 46, 43, 40, 37],
-                        '高风险客户占比': [15, 14, 13, 12, 11, 12, 13, 11, 10, 9, 8, 7],
-                        '服务中断次数': [3, 3, 2, 2, 1, 2, 2, 1, 1, 0, 0, 0],
-                        '市场增长率': [1.2, 1.5, 1.8, 2.0, 2.3, 2.1, 1.9, 2.2, 2.5, 2.7, 3.0, 3.2],
-                        '销售漏斗数量': [35, 40, 45, 50, 55, 52, 48, 58, 65, 72, 80, 88]
-                    }
-                    st.session_state.data = pd.DataFrame(data)
+                    st.session_state.data = sample_data()
+                    st.session_state.data_key = None
+                    st.session_state.appended_keys = []
+                    st.session_state.base_version += 1
                     st.session_state.analysis_complete = False
                     st.session_state.last_updated = datetime.now().strftime("%Y-%m-%d %H:%M")
+                    get_data_profile()
                     st.success("示例数据已生成！")
         
         with col2:
             st.markdown("#### 上传数据")
-            st.info("支持CSV或Excel格式的数据文件，需包含指定指标列")
+            st.info("支持CSV、Excel或Parquet/Arrow格式的数据文件，需包含指定指标列")
             
             uploaded_file = st.file_uploader(
                 "上传IDC销售数据文件", 
-                type=['csv', 'xlsx'],
+                type=['csv', 'xlsx', 'parquet', 'feather', 'arrow'],
                 help="请确保数据包含所有必要的指标列，具体要求见指标说明"
             )
             
             if uploaded_file:
                 try:
-                    # 根据文件类型读取
-                    with st.spinner("正在处理文件..."):
-                        if uploaded_file.name.endswith('.csv'):
-                            df = pd.read_csv(uploaded_file)
-                        elif uploaded_file.name.endswith('.xlsx'):
-                            df = pd.read_excel(uploaded_file, engine='openpyxl')
-                        
-                        # 基本列检查
-                        required_columns = ['月份', '服务器利用率', '带宽利用率', '机柜利用率', '新客户数量', 
-                                           '客户流失率', '平均合同期限', '月收入(万元)', '利润率', 
-                                           '应收账款周转天数', '高风险客户占比', '服务中断次数', 
-                                           '市场增长率', '销售漏斗数量']
-                        
-                        missing = [col for col in required_columns if col not in df.columns]
-                        if missing:
-                            st.error(f"缺少必要列: {', '.join(missing)}")
-                            st.info("请检查数据格式是否符合要求，参考示例数据结构")
-                        else:
+                    # 以文件内容哈希判断是否为新文件，重跑页面时不再重复解析
+                    file_key = content_hash(uploaded_file.getvalue()) + Path(uploaded_file.name).suffix
+                    if file_key != st.session_state.data_key:
+                        with st.spinner("正在处理文件..."), timer.stage('ingest'):
+                            progress_bar = st.progress(0.0, text="正在读取数据...")
+                            
+                            # Excel流式读取时报告已读行数
+                            def report_progress(done, total):
+                                progress_bar.progress(min(done / total, 1.0) if total else 0.0,
+                                                      text=f"已读取 {done:,} 行")
+                            
+                            sketch = StreamingSummary()
+                            df = get_upload_cache().get_or_create(
+                                file_key, lambda: read_dataset(uploaded_file, uploaded_file.name, report_progress, sketch))
+                            progress_bar.empty()
                             st.session_state.data = df
+                            st.session_state.data_key = file_key
+                            st.session_state.appended_keys = []
+                            st.session_state.base_version += 1
                             st.session_state.analysis_complete = False
                             st.session_state.last_updated = datetime.now().strftime("%Y-%m-%d %H:%M")
-                            st.success("数据上传成功！")
+                            get_data_profile()
+                            store_data_summary(sketch)
+                    st.success("数据上传成功！")
                             
+                except MissingColumnsError as e:
+                    st.error(str(e))
+                    st.info("请检查数据格式是否符合要求，参考示例数据结构")
                 except Exception as e:
                     st.error(f"文件处理错误: {str(e)}")
                     st.info("提示: 请确保Excel文件格式正确且未加密")
     
     if st.session_state.data is not None:
+        with st.expander("➕ 追加月份数据"):
+            st.caption("新增月份仅对新增行评分并合并到已有结果；若包含已有月份，将自动全量重新计算")
+            append_file = st.file_uploader(
+                "上传新增月份数据",
+                type=['csv', 'xlsx', 'parquet', 'feather', 'arrow'],
+                key=f"append_file_{st.session_state.base_version}"
+            )
+            
+            if append_file:
+                try:
+                    append_key = content_hash(append_file.getvalue()) + Path(append_file.name).suffix
+                    if append_key not in st.session_state.appended_keys:
+                        with st.spinner("正在追加数据..."):
+                            sketch = StreamingSummary()
+                            with timer.stage('ingest'):
+                                new_rows = get_upload_cache().get_or_create(
+                                    append_key, lambda: read_dataset(append_file, append_file.name, summary=sketch))
+                            previous = get_data_summary()['sketch']
+                            append_data(new_rows)
+                            # 已有草图与新增行草图合并，无需重新扫描全部数据
+                            if previous is not None and sketch.rows == len(new_rows):
+                                store_data_summary(previous.merge(sketch))
+                            st.session_state.appended_keys.append(append_key)
+                            st.session_state.last_updated = datetime.now().strftime("%Y-%m-%d %H:%M")
+                    st.success("新增数据已追加！")
+                except MissingColumnsError as e:
+                    st.error(str(e))
+                except Exception as e:
+                    st.error(f"数据追加错误: {str(e)}")
+        
         with st.expander("🔍 数据预览", expanded=True):
             st.dataframe(st.session_state.data.head(10), use_container_width=True)
             
             # 数据摘要统计
             st.markdown("**数据摘要统计**")
-            st.dataframe(st.session_state.data.describe(), use_container_width=True)
-
-# 健康度计算函数
-def calculate_health_scores(df):
-    # 使用全局权重
-    global weights
-    
-    # 计算各项指标得分
-    df['资源利用得分'] = (df['服务器利用率']*0.4 + df['带宽利用率']*0.4 + df['机柜利用率']*0.2) * weights['资源利用']
-    df['客户健康得分'] = ((100 - df['客户流失率'])*0.4 + (df['平均合同期限']/36*100)*0.4 + (df['新客户数量']/25*100)*0.2) * weights['客户健康']
-    df['财务健康得分'] = (df['利润率']*0.5 + (100 - df['应收账款周转天数'])/100*100*0.3 + df['月收入(万元)']/400*100*0.2) * weights['财务健康']
-    df['风险控制得分'] = ((100 - df['高风险客户占比'])*0.5 + (10 - df['服务中断次数'])/10*100*0.5) * weights['风险控制']
-    df['增长潜力得分'] = (df['市场增长率']/5*100*0.5 + df['销售漏斗数量']/100*100*0.5) * weights['增长潜力']
-    
-    # 计算总分
-    df['健康度总分'] = df[['资源利用得分', '客户健康得分', '财务健康得分', '风险控制得分', '增长潜力得分']].sum(axis=1)
-    
-    # 添加健康度等级
-    conditions = [
-        (df['健康度总分'] >= 85),
-        (df['健康度总分'] >= 70) & (df['健康度总分'] < 85),
-        (df['健康度总分'] >= 50) & (df['健康度总分'] < 70),
-        (df['健康度总分'] < 50)
-    ]
-    choices = ['优秀', '良好', '一般', '危险']
-    df['健康度等级'] = np.select(conditions, choices, default='未知')
-    
-    return df
+            data_summary = get_data_summary()
+            if data_summary['sketch'] is not None:
+                st.caption(f"数据超过 {APPROX_SUMMARY_ROWS:,} 行，分位数为流式草图近似值")
+            st.dataframe(data_summary['describe'], use_container_width=True)
 
 # 健康度分析页面
 if page_nav == "健康度分析" and st.session_state.data is not None:
     # 计算健康度指标
-    if not st.session_state.analysis_complete:
+    if results_stale():
         with st.spinner("正在分析数据，请稍候..."):
-            st.session_state.results = calculate_health_scores(st.session_state.data.copy())
-            st.session_state.analysis_complete = True
-            time.sleep(1)
+            ensure_results()
     
-    df = st.session_state.results
-    latest_data = df.iloc[-1]
+    df, latest_data = select_site()
+    
+    if len(st.session_state.site_summary) > 1:
+        with st.expander("🏢 各数据中心概览"):
+            st.dataframe(
+                st.session_state.site_summary[['健康度总分', '健康度等级', '环比健康度总分', '月数']]
+                .sort_values('健康度总分', ascending=False),
+                use_container_width=True
+            )
     
     st.subheader("健康度概览", divider="blue")
     
@@ -551,36 +884,40 @@ if page_nav == "健康度分析" and st.session_state.data is not None:
         """, unsafe_allow_html=True)
         
         # 健康度仪表盘
-        fig_gauge = go.Figure(go.Indicator(
-            mode = "gauge+number+delta",
-            value = latest_data['健康度总分'],
-            domain = {'x': [0, 1], 'y': [0, 1]},
-            title = {'text': "健康度总分", 'font': {'size': 20}},
-            delta = {'reference': df.iloc[-2]['健康度总分'] if len(df) > 1 else latest_data['健康度总分'], 
-                    'increasing': {'color': "var(--success)"},
-                    'decreasing': {'color': "var(--danger)"}},
-            gauge = {
-                'axis': {'range': [0, 100], 'tickwidth': 1, 'tickcolor': "var(--text-tertiary)"},
-                'steps': [
-                    {'range': [0, 50], 'color': "rgba(255, 77, 79, 0.2)"},
-                    {'range': [50, 70], 'color': "rgba(250, 173, 20, 0.2)"},
-                    {'range': [70, 85], 'color': "rgba(24, 144, 255, 0.2)"},
-                    {'range': [85, 100], 'color': "rgba(82, 196, 26, 0.2)"}
-                ],
-                'threshold': {
-                    'line': {'color': "var(--primary)", 'width': 4},
-                    'thickness': 0.8,
-                    'value': latest_data['健康度总分']
-                },
-                'bar': {'color': "var(--primary)"}
-            }
-        ))
-        fig_gauge.update_layout(
-            height=300,
-            margin=dict(l=20, r=20, t=50, b=20),
-            font={'color': "var(--text-secondary)"}
-        )
-        st.plotly_chart(fig_gauge, use_container_width=True)
+        with timer.stage('figure'):
+            def build_gauge():
+                fig_gauge = go.Figure(go.Indicator(
+                    mode = "gauge+number+delta",
+                    value = latest_data['健康度总分'],
+                    domain = {'x': [0, 1], 'y': [0, 1]},
+                    title = {'text': "健康度总分", 'font': {'size': 20}},
+                    delta = {'reference': latest_data['上期健康度总分'], 
+                            'increasing': {'color': "var(--success)"},
+                            'decreasing': {'color': "var(--danger)"}},
+                    gauge = {
+                        'axis': {'range': [0, 100], 'tickwidth': 1, 'tickcolor': "var(--text-tertiary)"},
+                        'steps': [
+                            {'range': [0, 50], 'color': "rgba(255, 77, 79, 0.2)"},
+                            {'range': [50, 70], 'color': "rgba(250, 173, 20, 0.2)"},
+                            {'range': [70, 85], 'color': "rgba(24, 144, 255, 0.2)"},
+                            {'range': [85, 100], 'color': "rgba(82, 196, 26, 0.2)"}
+                        ],
+                        'threshold': {
+                            'line': {'color': "var(--primary)", 'width': 4},
+                            'thickness': 0.8,
+                            'value': latest_data['健康度总分']
+                        },
+                        'bar': {'color': "var(--primary)"}
+                    }
+                ))
+                fig_gauge.update_layout(
+                    height=300,
+                    margin=dict(l=20, r=20, t=50, b=20),
+                    font={'color': "var(--text-secondary)"}
+                )
+                return fig_gauge
+            fig_gauge = cached_figure('gauge', (latest_data.name,), build_gauge)
+            st.plotly_chart(fig_gauge, use_container_width=True)
     
     with col2:
         st.markdown("<div class='section fade-in'>", unsafe_allow_html=True)
@@ -596,26 +933,30 @@ if page_nav == "健康度分析" and st.session_state.data is not None:
         ]
         
         # 使用条形图展示各维度得分
-        fig = px.bar(
-            x=categories, 
-            y=scores,
-            labels={'x': '维度', 'y': '得分'},
-            text=[f"{s:.1f}" for s in scores],
-            color=categories,
-            color_discrete_sequence=['#165DFF', '#69b1ff', '#4080FF', '#85ADFF', '#B8D0FF']
-        )
-        fig.update_layout(
-            yaxis_range=[0, 100],
-            showlegend=False,
-            height=350,
-            xaxis_title=None,
-            yaxis_title="得分",
-            font={'color': "var(--text-secondary)"},
-            plot_bgcolor='rgba(0, 0, 0, 0)',
-            paper_bgcolor='rgba(0, 0, 0, 0)'
-        )
-        fig.update_traces(textfont_size=14, textangle=0, textposition="outside")
-        st.plotly_chart(fig, use_container_width=True)
+        with timer.stage('figure'):
+            def build_dimension_bar():
+                fig = px.bar(
+                    x=categories, 
+                    y=scores,
+                    labels={'x': '维度', 'y': '得分'},
+                    text=[f"{s:.1f}" for s in scores],
+                    color=categories,
+                    color_discrete_sequence=['#165DFF', '#69b1ff', '#4080FF', '#85ADFF', '#B8D0FF']
+                )
+                fig.update_layout(
+                    yaxis_range=[0, 100],
+                    showlegend=False,
+                    height=350,
+                    xaxis_title=None,
+                    yaxis_title="得分",
+                    font={'color': "var(--text-secondary)"},
+                    plot_bgcolor='rgba(0, 0, 0, 0)',
+                    paper_bgcolor='rgba(0, 0, 0, 0)'
+                )
+                fig.update_traces(textfont_size=14, textangle=0, textposition="outside")
+                return fig
+            fig = cached_figure('dimension_bar', (latest_data.name,), build_dimension_bar)
+            st.plotly_chart(fig, use_container_width=True)
         
         # 各维度评分
         st.markdown("**维度评分详情**")
@@ -651,7 +992,7 @@ if page_nav == "健康度分析" and st.session_state.data is not None:
         st.markdown("<div class='metric-card hover-card'>", unsafe_allow_html=True)
         st.markdown("<div class='metric-label'>客户流失率</div>", unsafe_allow_html=True)
         st.markdown(f"<div class='metric-value'>{latest_data['客户流失率']:.1f}%</div>", unsafe_allow_html=True)
-        prev_loss = df.iloc[-2]['客户流失率'] if len(df) > 1 else latest_data['客户流失率']
+        prev_loss = latest_data['上期客户流失率']
         trend = "trend-down" if latest_data['客户流失率'] > prev_loss else "trend-up"
         change = abs(latest_data['客户流失率'] - prev_loss)
         st.markdown(f"<div class='{trend}'>{'↑ 改善' if latest_data['客户流失率'] < prev_loss else '↓ 恶化'} {change:.1f}%</div>", unsafe_allow_html=True)
@@ -661,7 +1002,7 @@ if page_nav == "健康度分析" and st.session_state.data is not None:
         st.markdown("<div class='metric-card hover-card'>", unsafe_allow_html=True)
         st.markdown("<div class='metric-label'>月收入</div>", unsafe_allow_html=True)
         st.markdown(f"<div class='metric-value'>{latest_data['月收入(万元)']:.1f} 万元</div>", unsafe_allow_html=True)
-        prev_rev = df.iloc[-2]['月收入(万元)'] if len(df) > 1 else latest_data['月收入(万元)']
+        prev_rev = latest_data['上期月收入(万元)']
         trend = "trend-up" if latest_data['月收入(万元)'] > prev_rev else "trend-down"
         change_pct = ((latest_data['月收入(万元)'] - prev_rev) / prev_rev * 100) if prev_rev != 0 else 0
         st.markdown(f"<div class='{trend}'>{'+' if latest_data['月收入(万元)'] > prev_rev else ''}{change_pct:.1f}%</div>", unsafe_allow_html=True)
@@ -673,179 +1014,275 @@ if page_nav == "健康度分析" and st.session_state.data is not None:
     st.subheader("📈 健康度趋势分析", divider="blue")
     st.markdown("<div class='section fade-in'>", unsafe_allow_html=True)
     
-    # 健康度总分趋势
-    tab1, tab2, tab3 = st.tabs(["健康度总分", "各维度趋势", "指标对比"])
-    
-    with tab1:
-        fig_trend = px.line(
-            df, 
-            x='月份', 
-            y='健康度总分', 
-            title='健康度总分变化趋势',
-            markers=True
-        )
-        fig_trend.update_traces(
-            line=dict(width=4, color='var(--primary)'),
-            marker=dict(size=8, color='var(--primary)', line=dict(width=2, color='white'))
-        )
-        fig_trend.add_hrect(
-            y0=85, y1=100, 
-            fillcolor="rgba(82, 196, 26, 0.1)", 
-            layer="below", 
-            annotation_text="优秀", 
-            annotation_position="top left"
-        )
-        fig_trend.add_hrect(
-            y0=70, y1=85, 
-            fillcolor="rgba(24, 144, 255, 0.1)", 
-            layer="below", 
-            annotation_text="良好"
-        )
-        fig_trend.add_hrect(
-            y0=50, y1=70, 
-            fillcolor="rgba(250, 173, 20, 0.1)", 
-            layer="below", 
-            annotation_text="一般"
-        )
-        fig_trend.add_hrect(
-            y0=0, y1=50, 
-            fillcolor="rgba(255, 77, 79, 0.1)", 
-            layer="below", 
-            annotation_text="危险"
-        )
-        fig_trend.update_layout(
-            height=450,
-            xaxis_title="月份",
-            yaxis_title="健康度总分",
-            hovermode="x unified",
-            font={'color': "var(--text-secondary)"},
-            plot_bgcolor='rgba(0, 0, 0, 0)',
-            paper_bgcolor='rgba(0, 0, 0, 0)',
-            title_font={'size': 18, 'color': "var(--text-primary)"}
-        )
-        st.plotly_chart(fig_trend, use_container_width=True)
-    
-    with tab2:
-        # 各维度趋势图
-        fig_dims = go.Figure()
-        dim_colors = ['#165DFF', '#69b1ff', '#4080FF', '#85ADFF', '#B8D0FF']
-        dimensions = ['资源利用得分', '客户健康得分', '财务健康得分', '风险控制得分', '增长潜力得分']
-        dim_names = ['资源利用', '客户健康', '财务健康', '风险控制', '增长潜力']
-        
-        for i, dim in enumerate(dimensions):
-            fig_dims.add_trace(go.Scatter(
-                x=df['月份'], 
-                y=df[dim]/weights[dim_names[i]],
-                name=dim_names[i],
-                line=dict(width=3, color=dim_colors[i]),
-                mode='lines+markers',
-                marker=dict(size=6, line=dict(width=1, color='white'))
-            ))
-        
-        fig_dims.update_layout(
-            title='各维度健康得分趋势',
-            height=450,
-            xaxis_title="月份",
-            yaxis_title="得分",
-            legend=dict(
-                orientation="h",
-                yanchor="bottom",
-                y=1.02,
-                xanchor="right",
-                x=1
-            ),
-            hovermode="x unified",
-            font={'color': "var(--text-secondary)"},
-            plot_bgcolor='rgba(0, 0, 0, 0)',
-            paper_bgcolor='rgba(0, 0, 0, 0)',
-            title_font={'size': 18, 'color': "var(--text-primary)"}
-        )
-        st.plotly_chart(fig_dims, use_container_width=True)
-    
-    with tab3:
+    # 趋势图表按区块局部重跑：调整时间范围、对比指标或敏感性参数时只重跑所在区块，不重跑整个页面
+    @timed_fragment("指标对比")
+    def metric_compare_section(time_range):
         # 选择要分析的指标
         selected_metrics = st.multiselect(
             "选择对比指标", 
-            options=['服务器利用率', '带宽利用率', '机柜利用率', '新客户数量', '客户流失率', 
-                    '平均合同期限', '月收入(万元)', '利润率', '应收账款周转天数', 
-                    '高风险客户占比', '服务中断次数', '市场增长率', '销售漏斗数量'],
+            options=METRIC_COLUMNS,
             default=['月收入(万元)', '利润率', '客户流失率']
         )
         
         if selected_metrics:
-            fig_metrics = go.Figure()
-            colors = px.colors.qualitative.Plotly
+            with timer.stage('figure'):
+                def build_metric_compare():
+                    fig_metrics = go.Figure()
+                    colors = px.colors.qualitative.Plotly
+                    metric_series = [downsample_series(df, latest_data.name, metric, time_range) for metric in selected_metrics]
+                    webgl = use_webgl(sum(len(metric_x) for metric_x, _ in metric_series), webgl_threshold)
             
-            for i, metric in enumerate(selected_metrics):
-                fig_metrics.add_trace(go.Scatter(
-                    x=df['月份'], 
-                    y=df[metric], 
-                    mode='lines+markers',
-                    name=metric,
-                    line=dict(width=3, color=colors[i % len(colors)]),
-                    marker=dict(size=6, line=dict(width=1, color='white'))
-                ))
+                    for i, (metric, (metric_x, metric_y)) in enumerate(zip(selected_metrics, metric_series)):
+                        fig_metrics.add_trace(scatter_trace(
+                            webgl,
+                            x=metric_x, 
+                            y=metric_y, 
+                            mode='lines+markers',
+                            name=metric,
+                            line=dict(width=3, color=colors[i % len(colors)]),
+                            marker=dict(size=6, line=dict(width=1, color='white'))
+                        ))
             
-            fig_metrics.update_layout(
-                title="关键指标趋势对比",
-                height=450,
-                xaxis_title="月份",
-                yaxis_title="指标值",
-                legend=dict(
-                    orientation="h",
-                    yanchor="bottom",
-                    y=1.02,
-                    xanchor="right",
-                    x=1
-                ),
-                hovermode="x unified",
-                font={'color': "var(--text-secondary)"},
-                plot_bgcolor='rgba(0, 0, 0, 0)',
-                paper_bgcolor='rgba(0, 0, 0, 0)',
-                title_font={'size': 18, 'color': "var(--text-primary)"}
+                    fig_metrics.update_layout(
+                        title="关键指标趋势对比",
+                        height=450,
+                        xaxis_title="月份",
+                        yaxis_title="指标值",
+                        legend=dict(
+                            orientation="h",
+                            yanchor="bottom",
+                            y=1.02,
+                            xanchor="right",
+                            x=1
+                        ),
+                        hovermode="x unified",
+                        font={'color': "var(--text-secondary)"},
+                        plot_bgcolor='rgba(0, 0, 0, 0)',
+                        paper_bgcolor='rgba(0, 0, 0, 0)',
+                        title_font={'size': 18, 'color': "var(--text-primary)"}
+                    )
+                    return fig_metrics
+                fig_metrics = cached_figure('metric_compare', (latest_data.name, tuple(selected_metrics), time_range, webgl_threshold), build_metric_compare)
+                st.plotly_chart(fig_metrics, use_container_width=True)
+    
+    @timed_fragment("权重敏感性")
+    def sensitivity_section():
+        # 在单纯形上抽样大量权重组合，评估健康度等级对权重选择的稳健程度
+        st.caption("对全部数据中心、全部月份按抽样权重重新计算总分，统计等级保持不变的概率与总分分布")
+        sens_cols = st.columns(3)
+        with sens_cols[0]:
+            n_samples = st.selectbox("权重抽样次数", [5000, SENSITIVITY_SAMPLES, 50000], index=1, key='sensitivity_samples')
+        with sens_cols[1]:
+            sampling = st.radio("抽样方式", ["围绕当前权重扰动", "单纯形均匀抽样"], key='sensitivity_mode', horizontal=True)
+        with sens_cols[2]:
+            concentration = st.slider("扰动集中度", 10, 200, 50, step=10, key='sensitivity_concentration',
+                                      disabled=sampling != "围绕当前权重扰动",
+                                      help="Dirichlet分布的集中度，越大抽样权重越接近当前权重")
+        
+        if st.checkbox("运行权重敏感性分析", key='sensitivity_on'):
+            with st.spinner("正在计算权重敏感性..."), timer.stage('sensitivity'):
+                W, sensitivity = get_weight_sensitivity(
+                    n_samples, concentration if sampling == "围绕当前权重扰动" else None)
+            site_sensitivity = sensitivity.loc[df.index]
+            latest_sensitivity = site_sensitivity.iloc[-1]
+            
+            stat_cols = st.columns(3)
+            stat_cols[0].metric("当前等级", str(latest_data['健康度等级']))
+            stat_cols[1].metric("等级稳定概率", f"{latest_sensitivity['等级稳定概率']:.1%}")
+            stat_cols[2].metric("总分90%区间", f"{latest_sensitivity['总分P5']:.1f} - {latest_sensitivity['总分P95']:.1f}")
+            
+            dist_cols = st.columns(2)
+            with dist_cols[0]:
+                grades = ['优秀', '良好', '一般', '危险']
+                fig_grade = px.bar(
+                    x=grades,
+                    y=[latest_sensitivity[f"{grade}概率"] for grade in grades],
+                    color=grades,
+                    color_discrete_map={'优秀': '#52C41A', '良好': '#1890FF', '一般': '#FAAD14', '危险': '#FF4D4F'},
+                    title="最新一期等级概率"
+                )
+                fig_grade.update_layout(height=350, showlegend=False, xaxis_title="", yaxis_title="概率",
+                                        yaxis_tickformat='.0%', plot_bgcolor='rgba(0, 0, 0, 0)',
+                                        paper_bgcolor='rgba(0, 0, 0, 0)')
+                st.plotly_chart(fig_grade, use_container_width=True)
+            with dist_cols[1]:
+                # 最新一期在各抽样权重下的总分分布
+                latest_dims = scoring_spec.dimension_scores(
+                    latest_data[scoring_spec.metrics].to_numpy(dtype=np.float64)[None, :])
+                latest_totals = (np.nan_to_num(latest_dims) @ W.T)[0]
+                fig_hist = px.histogram(x=latest_totals, nbins=60, title="最新一期总分分布")
+                fig_hist.add_vline(x=float(latest_data['健康度总分']), line_dash="dash", line_color="#FF4D4F",
+                                   annotation_text="当前权重")
+                fig_hist.update_layout(height=350, xaxis_title="健康度总分", yaxis_title="抽样次数",
+                                       plot_bgcolor='rgba(0, 0, 0, 0)', paper_bgcolor='rgba(0, 0, 0, 0)')
+                st.plotly_chart(fig_hist, use_container_width=True)
+            
+            # 各月总分的5%-95%分位带与等级稳定概率
+            webgl = use_webgl(4 * len(site_sensitivity), webgl_threshold)
+            fig_band = go.Figure()
+            fig_band.add_trace(scatter_trace(webgl, x=df['月份'], y=site_sensitivity['总分P95'], mode='lines',
+                                             line=dict(width=0), showlegend=False, hoverinfo='skip'))
+            fig_band.add_trace(scatter_trace(webgl, x=df['月份'], y=site_sensitivity['总分P5'], mode='lines',
+                                             line=dict(width=0), fill='tonexty',
+                                             fillcolor='rgba(22, 93, 255, 0.15)', name="5%-95%分位"))
+            fig_band.add_trace(scatter_trace(webgl, x=df['月份'], y=df['健康度总分'], mode='lines', name="当前权重总分",
+                                             line=dict(width=3, color='var(--primary)')))
+            fig_band.add_trace(scatter_trace(webgl, x=df['月份'], y=site_sensitivity['等级稳定概率'] * 100,
+                                             mode='lines', name="等级稳定概率(%)",
+                                             line=dict(width=2, dash='dot', color='var(--warning)')))
+            fig_band.update_layout(title="总分分布与等级稳定性趋势", height=400, xaxis_title="月份",
+                                   yaxis_title="分值 / 概率(%)", hovermode="x unified",
+                                   legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+                                   plot_bgcolor='rgba(0, 0, 0, 0)', paper_bgcolor='rgba(0, 0, 0, 0)')
+            st.plotly_chart(fig_band, use_container_width=True)
+            
+            if len(st.session_state.site_summary) > 1:
+                # 各站点最新一期的等级稳定性，最不稳定的排在前面
+                site_rows = st.session_state.site_rows
+                latest_rows = [rows[-1] for rows in site_rows.values()]
+                site_stability = sensitivity.iloc[latest_rows].set_axis(list(site_rows))
+                site_stability.insert(0, '健康度等级', st.session_state.results['健康度等级'].iloc[latest_rows].to_numpy())
+                st.markdown("**各数据中心最新一期等级稳定性**")
+                st.dataframe(site_stability.sort_values('等级稳定概率'), use_container_width=True)
+    
+    @timed_fragment("健康度趋势")
+    def trend_section():
+        # 时间范围，趋势图按所选范围降采样
+        months = df['月份']
+        time_range = (months.iloc[0], months.iloc[-1])
+        if months.iloc[0] < months.iloc[-1]:
+            time_range = st.slider(
+                "时间范围",
+                min_value=months.iloc[0].to_pydatetime(),
+                max_value=months.iloc[-1].to_pydatetime(),
+                value=(months.iloc[0].to_pydatetime(), months.iloc[-1].to_pydatetime()),
+                format="YYYY-MM-DD"
             )
-            st.plotly_chart(fig_metrics, use_container_width=True)
+    
+        # 健康度总分趋势
+        tab1, tab2, tab3, tab4 = st.tabs(["健康度总分", "各维度趋势", "指标对比", "权重敏感性"])
+    
+        with tab1:
+            with timer.stage('figure'):
+                def build_trend():
+                    trend_x, trend_y = downsample_series(df, latest_data.name, '健康度总分', time_range)
+                    webgl = use_webgl(len(trend_x), webgl_threshold)
+                    fig_trend = px.line(
+                        x=trend_x, 
+                        y=trend_y, 
+                        title='健康度总分变化趋势',
+                        markers=True,
+                        render_mode='webgl' if webgl else 'svg'
+                    )
+                    fig_trend.update_traces(
+                        line=dict(width=4, color=theme_color('var(--primary)', webgl)),
+                        marker=dict(size=8, color=theme_color('var(--primary)', webgl), line=dict(width=2, color='white'))
+                    )
+                    fig_trend.add_hrect(
+                        y0=85, y1=100, 
+                        fillcolor="rgba(82, 196, 26, 0.1)", 
+                        layer="below", 
+                        annotation_text="优秀", 
+                        annotation_position="top left"
+                    )
+                    fig_trend.add_hrect(
+                        y0=70, y1=85, 
+                        fillcolor="rgba(24, 144, 255, 0.1)", 
+                        layer="below", 
+                        annotation_text="良好"
+                    )
+                    fig_trend.add_hrect(
+                        y0=50, y1=70, 
+                        fillcolor="rgba(250, 173, 20, 0.1)", 
+                        layer="below", 
+                        annotation_text="一般"
+                    )
+                    fig_trend.add_hrect(
+                        y0=0, y1=50, 
+                        fillcolor="rgba(255, 77, 79, 0.1)", 
+                        layer="below", 
+                        annotation_text="危险"
+                    )
+                    fig_trend.update_layout(
+                        height=450,
+                        xaxis_title="月份",
+                        yaxis_title="健康度总分",
+                        hovermode="x unified",
+                        font={'color': "var(--text-secondary)"},
+                        plot_bgcolor='rgba(0, 0, 0, 0)',
+                        paper_bgcolor='rgba(0, 0, 0, 0)',
+                        title_font={'size': 18, 'color': "var(--text-primary)"}
+                    )
+                    return fig_trend
+                fig_trend = cached_figure('trend', (latest_data.name, time_range, webgl_threshold), build_trend)
+                st.plotly_chart(fig_trend, use_container_width=True)
+    
+        with tab2:
+            # 各维度趋势图
+            with timer.stage('figure'):
+                def build_dimension_trend():
+                    fig_dims = go.Figure()
+                    dim_colors = ['#165DFF', '#69b1ff', '#4080FF', '#85ADFF', '#B8D0FF']
+                    dimensions = ['资源利用得分', '客户健康得分', '财务健康得分', '风险控制得分', '增长潜力得分']
+                    dim_names = ['资源利用', '客户健康', '财务健康', '风险控制', '增长潜力']
+                    dim_series = [downsample_series(df, latest_data.name, dim, time_range) for dim in dimensions]
+                    webgl = use_webgl(sum(len(dim_x) for dim_x, _ in dim_series), webgl_threshold)
+        
+                    for i, (dim_x, dim_y) in enumerate(dim_series):
+                        fig_dims.add_trace(scatter_trace(
+                            webgl,
+                            x=dim_x, 
+                            y=dim_y/weights[dim_names[i]],
+                            name=dim_names[i],
+                            line=dict(width=3, color=dim_colors[i]),
+                            mode='lines+markers',
+                            marker=dict(size=6, line=dict(width=1, color='white'))
+                        ))
+        
+                    fig_dims.update_layout(
+                        title='各维度健康得分趋势',
+                        height=450,
+                        xaxis_title="月份",
+                        yaxis_title="得分",
+                        legend=dict(
+                            orientation="h",
+                            yanchor="bottom",
+                            y=1.02,
+                            xanchor="right",
+                            x=1
+                        ),
+                        hovermode="x unified",
+                        font={'color': "var(--text-secondary)"},
+                        plot_bgcolor='rgba(0, 0, 0, 0)',
+                        paper_bgcolor='rgba(0, 0, 0, 0)',
+                        title_font={'size': 18, 'color': "var(--text-primary)"}
+                    )
+                    return fig_dims
+                fig_dims = cached_figure('dimension_trend', (latest_data.name, time_range, webgl_threshold), build_dimension_trend)
+                st.plotly_chart(fig_dims, use_container_width=True)
+    
+        with tab3:
+            metric_compare_section(time_range)
+        
+        with tab4:
+            sensitivity_section()
+    
+    trend_section()
     
     st.markdown("</div>", unsafe_allow_html=True)
 
 # 风险分析页面
 if page_nav == "风险洞察" and st.session_state.data is not None:
-    if not st.session_state.analysis_complete:
-        st.session_state.results = calculate_health_scores(st.session_state.data.copy())
-        st.session_state.analysis_complete = True
+    ensure_results()
     
-    df = st.session_state.results
-    latest_data = df.iloc[-1]
+    df, latest_data = select_site()
     
     st.subheader("风险分析与优化建议", divider="blue")
     st.markdown("<div class='section fade-in'>", unsafe_allow_html=True)
     
     # 识别主要风险点
-    risk_points = []
-    if latest_data['客户流失率'] > 3.0:
-        risk_points.append(("客户流失率过高", 
-                          f"当前流失率 {latest_data['客户流失率']:.1f}%，高于3%的安全阈值",
-                          "高"))
-    
-    if latest_data['高风险客户占比'] > 10.0:
-        risk_points.append(("高风险客户过多", 
-                          f"高风险客户占比 {latest_data['高风险客户占比']:.1f}%，高于10%的安全阈值",
-                          "高"))
-    
-    if latest_data['应收账款周转天数'] > 45.0:
-        risk_points.append(("回款周期过长", 
-                          f"应收账款周转天数 {latest_data['应收账款周转天数']}天，高于45天的安全阈值",
-                          "中"))
-    
-    if latest_data['服务中断次数'] > 1.0:
-        risk_points.append(("服务稳定性问题", 
-                          f"服务中断次数 {latest_data['服务中断次数']}次，影响客户满意度",
-                          "高"))
-    
-    if latest_data['销售漏斗数量'] < 40.0:
-        risk_points.append(("销售机会不足", 
-                          f"销售漏斗数量仅 {latest_data['销售漏斗数量']}，低于40的安全阈值",
-                          "中"))
+    with timer.stage('risk'):
+        risk_points = evaluate_risks(latest_data)
     
     # 风险概览卡片
     col_sum, col_high, col_medium = st.columns(3)
@@ -897,6 +1334,51 @@ if page_nav == "风险洞察" and st.session_state.data is not None:
     else:
         st.success("✅ 未发现重大风险点，当前销售健康状况良好！")
     
+    # 风险时间线：各规则在历史各月的触发情况
+    st.markdown("---")
+    st.markdown("#### 风险时间线")
+    with timer.stage('risk'):
+        masks = get_risk_masks()
+        site_masks = masks.iloc[st.session_state.site_rows[latest_data.name]]
+    
+    with timer.stage('figure'):
+        def build_risk_timeline():
+            severity = np.array([2 if rule['severity'] == "高" else 1 for rule in RISK_RULES])
+            fig_risk = go.Figure(go.Heatmap(
+                x=df['月份'],
+                y=site_masks.columns,
+                z=site_masks.to_numpy().T * severity[:, None],
+                zmin=0,
+                zmax=2,
+                colorscale=[[0, 'rgba(82, 196, 26, 0.15)'], [0.5, '#FAAD14'], [1, '#FF4D4F']],
+                showscale=False,
+                xgap=1,
+                ygap=2,
+                hovertemplate='%{x|%Y-%m}<br>%{y}<extra></extra>'
+            ))
+            fig_risk.update_layout(
+                height=300,
+                margin=dict(l=20, r=20, t=20, b=20),
+                xaxis_title="月份",
+                font={'color': "var(--text-secondary)"},
+                plot_bgcolor='rgba(0, 0, 0, 0)',
+                paper_bgcolor='rgba(0, 0, 0, 0)'
+            )
+            return fig_risk
+        fig_risk = cached_figure('risk_timeline', (latest_data.name,), build_risk_timeline)
+        st.plotly_chart(fig_risk, use_container_width=True)
+    
+    monthly = site_masks.sum(axis=1)
+    st.caption(f"历史{len(monthly)}个月中，{int((monthly > 0).sum())}个月存在风险点，单月最多{int(monthly.max())}个")
+    
+    # 多数据中心时展示各站点风险统计
+    if len(st.session_state.site_summary) > 1:
+        with st.expander("各数据中心风险统计"):
+            with timer.stage('risk'):
+                risk_counts = site_risk_counts(st.session_state.results, st.session_state.site_summary, masks)
+            st.caption("各规则列为历史触发月数")
+            st.dataframe(risk_counts.sort_values('当前风险点数', ascending=False), use_container_width=True)
+    
     # 优化建议
     st.markdown("---")
     st.info("💡 综合优化建议：")
@@ -946,151 +1428,154 @@ if page_nav == "风险洞察" and st.session_state.data is not None:
 
 # 报告导出页面
 if page_nav == "报告导出" and st.session_state.data is not None:
-    if not st.session_state.analysis_complete:
-        st.session_state.results = calculate_health_scores(st.session_state.data.copy())
-        st.session_state.analysis_complete = True
+    ensure_results()
     
     df = st.session_state.results
+    site_summary = st.session_state.site_summary
     
     st.subheader("分析报告导出", divider="blue")
     st.markdown("<div class='section fade-in'>", unsafe_allow_html=True)
     
-    # 报告配置选项
-    st.markdown("### 报告设置")
-    report_cols = st.columns(3)
-    
-    with report_cols[0]:
-        report_title = st.text_input("报告标题", "IDC销售健康度分析报告")
-    
-    with report_cols[1]:
-        company_name = st.text_input("公司名称", "ABC数据中心")
-    
-    with report_cols[2]:
-        report_date = st.date_input("报告日期", datetime.today())
+    # 报告设置与导出按钮局部重跑，输入标题等内容时不重跑整个页面
+    @timed_fragment("报告设置")
+    def export_section():
+        # 报告配置选项
+        st.markdown("### 报告设置")
+        report_cols = st.columns(3)
+    
+        with report_cols[0]:
+            report_title = st.text_input("报告标题", "IDC销售健康度分析报告")
+    
+        with report_cols[1]:
+            company_name = st.text_input("公司名称", "ABC数据中心")
+    
+        with report_cols[2]:
+            report_date = st.date_input("报告日期", datetime.today())
+    
+        # 导出选项
+        st.markdown("### 导出选项")
+        export_cols = st.columns(4)
+    
+        with export_cols[0]:
+            csv_compression = st.selectbox("CSV压缩", ["不压缩"] + csv_compressions(),
+                                           help="多数据中心导出文件较大时建议压缩")
+            compression = None if csv_compression == "不压缩" else csv_compression
+            st.download_button(
+                label="导出CSV报告",
+                data=lazy_export((st.session_state.results_key, 'csv', compression),
+                                 lambda df=df, compression=compression: to_csv_bytes(df, compression)),
+                file_name=(f"{company_name}_IDC健康度报告_{report_date.strftime('%Y%m%d')}.csv"
+                           + CSV_COMPRESSION_SUFFIXES.get(compression, '')),
+                mime='application/gzip' if compression == 'gzip' else
+                     'application/zstd' if compression == 'zstd' else 'text/csv',
+                on_click='ignore',
+                use_container_width=True
+            )
     
-    # 导出选项
-    st.markdown("### 导出选项")
-    export_cols = st.columns(3)
+        with export_cols[1]:
+            # 同一数据与报告设置只生成一次，生成期间页面其余部分可继续操作
+            excel_key = (st.session_state.results_key, report_title, company_name, report_date)
+            if st.button("导出Excel报告", use_container_width=True):
+                summary = (report_title, f"{company_name} | {report_date.strftime('%Y-%m-%d')}", site_summary)
+                with timer.stage('export'):
+                    start_export_job('excel_job', excel_key,
+                                     lambda path, progress: write_excel_report(path, df, summary, progress=progress),
+                                     '.xlsx', len(df))
+            export_job_status(
+                'excel_job', excel_key,
+                label="下载Excel报告",
+                file_name=f"{company_name}_IDC健康度报告_{report_date.strftime('%Y%m%d')}.xlsx",
+                mime='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+                progress_text="正在生成Excel报告，已写入 {done:,} 行",
+                error_text="Excel导出失败"
+            )
     
-    with export_cols[0]:
-        if st.button("导出CSV报告", use_container_width=True):
-            try:
-                csv = df.to_csv(index=False).encode('utf-8')
-                st.download_button(
-                    label="下载CSV报告",
-                    data=csv,
-                    file_name=f"{company_name}_IDC健康度报告_{report_date.strftime('%Y%m%d')}.csv",
-                    mime='text/csv',
-                    use_container_width=True
-                )
-            except Exception as e:
-                st.error(f"CSV导出失败: {str(e)}")
+        with export_cols[2]:
+            st.download_button(
+                label="导出Parquet数据",
+                data=lazy_export((st.session_state.results_key, 'parquet'), lambda df=df: to_parquet_bytes(df)),
+                file_name=f"{company_name}_IDC健康度数据_{report_date.strftime('%Y%m%d')}.parquet",
+                mime='application/vnd.apache.parquet',
+                on_click='ignore',
+                use_container_width=True
+            )
     
-    with export_cols[1]:
-        if st.button("导出Excel报告", use_container_width=True):
-            try:
-                output = io.BytesIO()
-                with pd.ExcelWriter(output, engine='openpyxl') as writer:
-                    df.to_excel(writer, index=False, sheet_name='健康度数据')
-                    
-                    # 添加摘要工作表
-                    workbook = writer.book
-                    summary_sheet = workbook.create_sheet("报告摘要")
-                    
-                    # 添加摘要内容
-                    summary_sheet['A1'] = report_title
-                    summary_sheet['A2'] = f"{company_name} | {report_date.strftime('%Y-%m-%d')}"
-                    summary_sheet['A4'] = "健康度总分"
-                    summary_sheet['B4'] = df.iloc[-1]['健康度总分']
-                    summary_sheet['A5'] = "健康度等级"
-                    summary_sheet['B5'] = df.iloc[-1]['健康度等级']
-                    
-                st.download_button(
-                    label="下载Excel报告",
-                    data=output.getvalue(),
-                    file_name=f"{company_name}_IDC健康度报告_{report_date.strftime('%Y%m%d')}.xlsx",
-                    mime='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-                    use_container_width=True
-                )
-            except Exception as e:
-                st.error(f"Excel导出失败: {str(e)}")
+        with export_cols[3]:
+            # 各数据中心分别生成HTML报告（内嵌静态图表），多进程并行渲染后打包下载
+            report_key = (st.session_state.results_key, report_title, company_name, report_date)
+            if st.button("生成各站点报告", use_container_width=True,
+                         help="每个数据中心一份自包含HTML报告，打包为zip下载"):
+                site_rows = st.session_state.site_rows
+                with timer.stage('export'):
+                    start_export_job('report_job', report_key,
+                                     lambda path, progress: build_report_bundle(
+                                         path, df, site_summary, site_rows, report_title, company_name,
+                                         report_date, weights, progress=progress),
+                                     '.zip', len(site_summary))
+            export_job_status(
+                'report_job', report_key,
+                label="下载站点报告包",
+                file_name=f"{company_name}_IDC健康度站点报告_{report_date.strftime('%Y%m%d')}.zip",
+                mime='application/zip',
+                progress_text="正在生成站点报告 {done}/{total}",
+                error_text="站点报告生成失败"
+            )
     
-    with export_cols[2]:
-        st.markdown("""
-        <div style='background-color:#F0F2F5; padding:20px; border-radius:12px; height:100%; display:flex; flex-direction:column; justify-content:center; align-items:center; text-align:center;' class='hover-card'>
-            <div style='font-size:40px; margin-bottom:10px;'>📄</div>
-            <div style='font-weight:600; margin-bottom:5px;'>PDF报告导出</div>
-            <div style='font-size:13px; color:var(--text-tertiary);'>专业PDF报告生成功能即将上线，敬请期待</div>
-        </div>
-        """, unsafe_allow_html=True)
+    export_section()
     
     st.markdown("</div>", unsafe_allow_html=True)
 
 # 趋势预测页面
 if page_nav == "趋势预测" and st.session_state.data is not None:
-    if not st.session_state.analysis_complete:
-        st.session_state.results = calculate_health_scores(st.session_state.data.copy())
-        st.session_state.analysis_complete = True
+    ensure_results()
     
-    df = st.session_state.results
+    df, latest_data = select_site()
     
     st.subheader("未来趋势预测", divider="blue")
     st.markdown("<div class='section fade-in'>", unsafe_allow_html=True)
     
-    st.info("基于历史数据的线性回归预测，结果仅供参考，实际业务需结合更多因素分析")
+    st.info(f"基于历史数据的线性回归预测，阴影为残差自助法估计的{INTERVAL_LEVEL:.0%}预测区间，结果仅供参考，实际业务需结合更多因素分析")
     
-    # 选择预测指标
-    pred_metric = st.selectbox(
-        "选择预测指标",
-        options=['健康度总分', '服务器利用率', '带宽利用率', '机柜利用率', 
-                '客户流失率', '月收入(万元)', '利润率', '销售漏斗数量'],
-        index=0
-    )
+    # 预测指标、周期与回归窗口只影响本区块，调整时局部重跑
+    @timed_fragment("预测设置")
+    def forecast_section():
+        # 选择预测指标
+        pred_metric = st.selectbox(
+            "选择预测指标",
+            options=FORECAST_METRICS,
+            index=0
+        )
     
-    # 预测周期
-    periods = st.slider("预测周期（月）", 1, 12, 6)
+        # 预测周期与回归窗口
+        periods = st.slider("预测周期（月）", 1, FORECAST_HORIZON, 6)
+        lookback = st.slider("回归窗口（月）", 3, 24, FORECAST_LOOKBACK, help="使用最近多少个月的数据拟合线性趋势")
     
-    if st.button("生成预测", type="primary"):
-        with st.spinner("正在生成预测..."):
-            time.sleep(1)
-            
-            # 简单线性预测
-            last_date = df['月份'].iloc[-1]
-            future_dates = [last_date + timedelta(days=30*i) for i in range(1, periods+1)]
-            
-            # 使用最后6个月数据进行预测
-            y = df[pred_metric].values[-6:]
-            x = np.arange(len(y))
-            
-            # 线性回归
-            coeff = np.polyfit(x, y, 1)
-            future_vals = coeff[0] * np.arange(len(y), len(y)+periods) + coeff[1]
-            
-            # 确保预测值在合理范围内
-            if pred_metric in ['服务器利用率', '带宽利用率', '机柜利用率', '利润率', '高风险客户占比', '客户流失率']:
-                future_vals = np.clip(future_vals, 0, 100)
-            elif pred_metric == '健康度总分':
-                future_vals = np.clip(future_vals, 0, 100)
-            elif pred_metric in ['服务中断次数']:
-                future_vals = np.clip(future_vals, 0, None)
-            
+        # 所有站点与指标的预测一次算出并缓存，切换指标或预测周期只读取缓存
+        with timer.stage('forecast'):
+            future_vals = get_forecasts(lookback).loc[(latest_data.name, pred_metric)].to_numpy()[:periods]
+            intervals = get_forecast_intervals(latest_data.name, lookback).loc[(latest_data.name, pred_metric)]
+            lower_vals = intervals['下限'].to_numpy()[:periods]
+            upper_vals = intervals['上限'].to_numpy()[:periods]
+            future_dates = forecast_dates(df['月份'].iloc[-1], periods)
+    
+        with timer.stage('figure'):
             # 创建预测数据框
             forecast_df = pd.DataFrame({
                 '月份': future_dates,
                 pred_metric: future_vals,
                 '类型': '预测值'
             })
-            
+    
             # 历史数据
             history_df = pd.DataFrame({
                 '月份': df['月份'],
                 pred_metric: df[pred_metric],
                 '类型': '历史值'
             })
-            
+    
             # 合并数据
             full_df = pd.concat([history_df, forecast_df])
-            
+    
             # 绘制预测图
             fig = px.line(
                 full_df, 
@@ -1100,7 +1585,7 @@ if page_nav == "趋势预测" and st.session_state.data is not None:
                 color_discrete_map={'历史值': 'var(--primary)', '预测值': 'var(--danger)'},
                 title=f'{pred_metric}趋势预测'
             )
-            
+    
             # 添加最后历史点
             fig.add_trace(go.Scatter(
                 x=[df['月份'].iloc[-1]], 
@@ -1109,7 +1594,7 @@ if page_nav == "趋势预测" and st.session_state.data is not None:
                 marker=dict(size=10, color='var(--primary)', line=dict(width=2, color='white')),
                 name='当前值'
             ))
-            
+    
             # 添加预测开始点
             fig.add_trace(go.Scatter(
                 x=[future_dates[0]], 
@@ -1118,8 +1603,27 @@ if page_nav == "趋势预测" and st.session_state.data is not None:
                 marker=dict(size=10, color='var(--danger)', line=dict(width=2, color='white')),
                 name='预测起点'
             ))
-            
+    
             # 添加置信区间阴影
+            fig.add_trace(go.Scatter(
+                x=future_dates,
+                y=upper_vals,
+                mode='lines',
+                line=dict(width=0),
+                hoverinfo='skip',
+                showlegend=False
+            ))
+            fig.add_trace(go.Scatter(
+                x=future_dates,
+                y=lower_vals,
+                mode='lines',
+                line=dict(width=0),
+                fill='tonexty',
+                fillcolor='rgba(255, 77, 79, 0.15)',
+                name=f'{INTERVAL_LEVEL:.0%}预测区间',
+                customdata=upper_vals,
+                hovertemplate='%{y:.1f} ~ %{customdata:.1f}'
+            ))
             fig.update_layout(
                 height=500,
                 xaxis_title="月份",
@@ -1136,17 +1640,19 @@ if page_nav == "趋势预测" and st.session_state.data is not None:
                 paper_bgcolor='rgba(0, 0, 0, 0)',
                 title_font={'size': 18, 'color': "var(--text-primary)"}
             )
-            
+    
             st.plotly_chart(fig, use_container_width=True)
-            
-            # 显示预测摘要
-            change_pct = ((future_vals[-1] - df[pred_metric].iloc[-1]) / df[pred_metric].iloc[-1]) * 100
-            st.markdown("<div class='metric-card hover-card'>", unsafe_allow_html=True)
-            st.markdown(f"<div class='metric-label'>{periods}个月后预测值</div>", unsafe_allow_html=True)
-            st.markdown(f"<div class='metric-value'>{future_vals[-1]:.1f}</div>", unsafe_allow_html=True)
-            trend_class = "trend-up" if future_vals[-1] > df[pred_metric].iloc[-1] else "trend-down"
-            st.markdown(f"<div class='{trend_class}'>与当前相比: {'+' if future_vals[-1] > df[pred_metric].iloc[-1] else ''}{change_pct:.1f}%</div>", unsafe_allow_html=True)
-            st.markdown("</div>", unsafe_allow_html=True)
+    
+        # 显示预测摘要
+        change_pct = ((future_vals[-1] - df[pred_metric].iloc[-1]) / df[pred_metric].iloc[-1]) * 100
+        st.markdown("<div class='metric-card hover-card'>", unsafe_allow_html=True)
+        st.markdown(f"<div class='metric-label'>{periods}个月后预测值</div>", unsafe_allow_html=True)
+        st.markdown(f"<div class='metric-value'>{future_vals[-1]:.1f}</div>", unsafe_allow_html=True)
+        trend_class = "trend-up" if future_vals[-1] > df[pred_metric].iloc[-1] else "trend-down"
+        st.markdown(f"<div class='{trend_class}'>与当前相比: {'+' if future_vals[-1] > df[pred_metric].iloc[-1] else ''}{change_pct:.1f}%</div>", unsafe_allow_html=True)
+        st.markdown("</div>", unsafe_allow_html=True)
+    
+    forecast_section()
     
     st.markdown("</div>", unsafe_allow_html=True)
 
@@ -1180,4 +1686,26 @@ st.sidebar.markdown("""
 - 超过10万行数据时启用抽样分析
 - 关闭不需要的可视化图表
 - 定期清理浏览器缓存
-""")
\ No newline at end of file
+""")
+
+# 性能诊断 - 记录本次重跑各阶段耗时并按需导出
+metrics_registry = get_metrics_registry()
+rerun_record = record_rerun(timer, page_nav)
+timing_active = False
+
+if st.sidebar.checkbox("显示性能诊断", key='show_diagnostics'):
+    with st.sidebar.expander("⏱️ 性能诊断", expanded=True):
+        stage_df = pd.DataFrame({
+            '阶段': list(rerun_record['stages']),
+            '耗时(毫秒)': [v * 1000 for v in rerun_record['stages'].values()]
+        })
+        st.dataframe(stage_df, use_container_width=True, hide_index=True)
+        st.caption(f"本次重跑总耗时 {rerun_record['total'] * 1000:.0f} 毫秒")
+        if SHARED_DATASETS:
+            dataset_store = get_dataset_store()
+            st.caption(f"共享数据集 {len(dataset_store)} 个，占用 {dataset_store.nbytes / 1024 / 1024:.1f} MB，"
+                       f"命中 {dataset_store.hits} 次")
+        st.download_button("导出Prometheus指标", metrics_registry.to_prometheus(),
+                           file_name="idc_metrics.prom", mime="text/plain", use_container_width=True)
+        st.download_button("导出JSON lines", metrics_registry.to_jsonl(),
+                           file_name="idc_metrics.jsonl", mime="application/x-ndjson", use_container_width=True)
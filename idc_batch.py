@@ -0,0 +1,90 @@
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import pandas as pd
+
+from idc_engine import (SITE_COLUMN, ScoringSpec, ScoringSpecError, calculate_health_scores, risk_masks,
+                        summarize_sites)
+from idc_io import read_dataset, to_parquet_bytes, write_excel_report
+
+# 批量健康度评分 - 无需启动Streamlit页面
+# 用法: python idc_batch.py 输入目录 -o 输出目录 [-j 进程数] [--spec 评分规则.json]
+
+SUPPORTED_SUFFIXES = ('.csv', '.xlsx', '.parquet', '.feather', '.arrow')
+
+
+def find_inputs(input_dir):
+    return sorted(p for p in Path(input_dir).iterdir() if p.suffix.lower() in SUPPORTED_SUFFIXES)
+
+
+# 单个文件评分，在子进程中执行；返回每个数据中心最新一期的汇总行
+def score_file(path, output_dir, output_format='csv', spec=None):
+    df = calculate_health_scores(read_dataset(path), spec=spec)
+    out_path = Path(output_dir) / f"{path.stem}_scored.{output_format}"
+    if output_format == 'xlsx':
+        write_excel_report(out_path, df)
+    elif output_format == 'parquet':
+        out_path.write_bytes(to_parquet_bytes(df))
+    else:
+        df.to_csv(out_path, index=False, encoding='utf-8')
+
+    summary, _ = summarize_sites(df)
+    risk_counts = risk_masks(summary).sum(axis=1)
+    return [{
+        '文件': path.name,
+        SITE_COLUMN: site,
+        '月数': int(latest['月数']),
+        '健康度总分': round(float(latest['健康度总分']), 2),
+        '健康度等级': latest['健康度等级'],
+        '风险点数量': int(risk_counts[site]),
+        '输出文件': out_path.name
+    } for site, latest in summary.iterrows()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="IDC销售健康度批量评分")
+    parser.add_argument('input_dir', help="包含CSV/XLSX/Parquet/Arrow数据文件的目录")
+    parser.add_argument('-o', '--output-dir', default='scored', help="评分结果输出目录")
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count(), help="并行进程数")
+    parser.add_argument('--format', choices=['csv', 'xlsx', 'parquet'], default='csv', help="评分结果文件格式")
+    parser.add_argument('--spec', help="评分规则JSON文件，默认使用内置规则")
+    args = parser.parse_args(argv)
+
+    try:
+        spec = ScoringSpec.load(args.spec) if args.spec else None
+    except (OSError, ScoringSpecError) as e:
+        print(f"评分规则加载失败: {e}", file=sys.stderr)
+        return 1
+
+    inputs = find_inputs(args.input_dir)
+    if not inputs:
+        print(f"未在 {args.input_dir} 中找到支持的数据文件", file=sys.stderr)
+        return 1
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    summaries, succeeded, failures = [], 0, 0
+    with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+        futures = {pool.submit(score_file, path, args.output_dir, args.format, spec): path for path in inputs}
+        for done, future in enumerate(as_completed(futures), 1):
+            path = futures[future]
+            try:
+                site_summaries = future.result()
+                summaries.extend(site_summaries)
+                succeeded += 1
+                print(f"[{done}/{len(inputs)}] {path.name} 完成（{len(site_summaries)} 个数据中心）")
+            except Exception as e:
+                failures += 1
+                print(f"[{done}/{len(inputs)}] {path.name} 失败: {e}", file=sys.stderr)
+
+    if summaries:
+        summary = pd.DataFrame(summaries).sort_values('文件', kind='stable')
+        summary.to_csv(Path(args.output_dir) / '评分汇总.csv', index=False, encoding='utf-8')
+    print(f"共处理 {len(inputs)} 个文件，成功 {succeeded} 个，失败 {failures} 个")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
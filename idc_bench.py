@@ -0,0 +1,188 @@
+import argparse
+import io
+import json
+import platform
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from idc_engine import (calculate_health_scores, forecast_all, forecast_intervals, risk_masks, score_frame,
+                        summarize_sites)
+from idc_io import read_csv_dataset, read_excel_dataset, to_csv_bytes, to_parquet_bytes, write_excel_report
+from idc_synth import generate_synthetic_data
+
+# 性能基准 - 以合成数据按不同规模测量各阶段吞吐，结果追加到JSON lines文件
+# 用法: python idc_bench.py --sizes 12,1e4,1e6 --output bench_results.jsonl --baseline bench_baseline.jsonl
+
+DEFAULT_SIZES = '12,1e3,1e5,1e6,1e7'
+# Excel单表上限约104万行，超过该规模的Excel阶段自动跳过
+EXCEL_MAX_ROWS = 200_000
+
+
+# 各阶段以准备好的上下文为输入，只计时阶段本身
+def _ingest_csv(ctx):
+    read_csv_dataset(io.BytesIO(ctx['csv']))
+
+
+def _ingest_excel(ctx):
+    read_excel_dataset(io.BytesIO(ctx['xlsx']))
+
+
+def _score(ctx):
+    score_frame(ctx['data'])
+
+
+def _summarize(ctx):
+    summarize_sites(ctx['results'])
+
+
+def _risk(ctx):
+    risk_masks(ctx['results'])
+
+
+def _forecast(ctx):
+    forecast_all(ctx['results'], ctx['site_rows'])
+
+
+def _forecast_interval(ctx):
+    forecast_intervals(ctx['results'], ctx['site_rows'])
+
+
+def _export_csv(ctx):
+    to_csv_bytes(ctx['results'])
+
+
+def _export_csv_gzip(ctx):
+    to_csv_bytes(ctx['results'], 'gzip')
+
+
+def _export_csv_zstd(ctx):
+    to_csv_bytes(ctx['results'], 'zstd')
+
+
+def _export_excel(ctx):
+    write_excel_report(io.BytesIO(), ctx['results'])
+
+
+def _export_parquet(ctx):
+    to_parquet_bytes(ctx['results'])
+
+
+STAGES = {
+    'ingest_csv': _ingest_csv,
+    'ingest_excel': _ingest_excel,
+    'score': _score,
+    'summarize': _summarize,
+    'risk': _risk,
+    'forecast': _forecast,
+    'forecast_interval': _forecast_interval,
+    'export_csv': _export_csv,
+    'export_csv_gzip': _export_csv_gzip,
+    'export_csv_zstd': _export_csv_zstd,
+    'export_excel': _export_excel,
+    'export_parquet': _export_parquet
+}
+EXCEL_STAGES = ('ingest_excel', 'export_excel')
+
+
+def prepare_context(rows, months, stages, seed=0):
+    n_sites = max(1, -(-rows // months))
+    data = generate_synthetic_data(n_sites, min(rows, months), seed=seed)
+    results = calculate_health_scores(data.copy())
+    summary, site_rows = summarize_sites(results)
+    ctx = {'data': data, 'results': results, 'summary': summary, 'site_rows': site_rows}
+    if 'ingest_csv' in stages:
+        ctx['csv'] = data.to_csv(index=False).encode('utf-8')
+    if 'ingest_excel' in stages:
+        output = io.BytesIO()
+        data.to_excel(output, index=False, engine='openpyxl')
+        ctx['xlsx'] = output.getvalue()
+    return ctx
+
+
+def time_stage(func, ctx, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(ctx)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def run_benchmarks(sizes, stages, months=36, repeat=3, excel_max_rows=EXCEL_MAX_ROWS, log=print):
+    run_at = datetime.now().isoformat(timespec='seconds')
+    records = []
+    for rows in sizes:
+        size_stages = [s for s in stages if s not in EXCEL_STAGES or rows <= excel_max_rows]
+        ctx = prepare_context(rows, months, size_stages)
+        for stage in size_stages:
+            seconds = time_stage(STAGES[stage], ctx, repeat)
+            record = {
+                'run_at': run_at,
+                'rows': len(ctx['data']),
+                'sites': len(ctx['summary']),
+                'stage': stage,
+                'seconds': round(seconds, 6),
+                'rows_per_sec': round(len(ctx['data']) / seconds, 1) if seconds else None,
+                'python': platform.python_version(),
+                'pandas': pd.__version__,
+                'numpy': np.__version__
+            }
+            records.append(record)
+            log(f"{record['rows']:>10,} 行  {stage:<15} {seconds * 1000:10.1f} ms  {record['rows_per_sec'] or 0:>14,.0f} 行/秒")
+    return records
+
+
+# 与基线比较吞吐，返回下降超过容差的 (阶段, 行数, 基线吞吐, 当前吞吐)
+def find_regressions(records, baseline, tolerance=0.2):
+    reference = {(r['stage'], r['rows']): r['rows_per_sec'] for r in baseline if r.get('rows_per_sec')}
+    regressions = []
+    for record in records:
+        expected = reference.get((record['stage'], record['rows']))
+        if expected and record['rows_per_sec'] and record['rows_per_sec'] < expected * (1 - tolerance):
+            regressions.append((record['stage'], record['rows'], expected, record['rows_per_sec']))
+    return regressions
+
+
+def read_jsonl(path):
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="IDC健康度分析性能基准")
+    parser.add_argument('--sizes', default=DEFAULT_SIZES, help="逗号分隔的数据行数，如 12,1e4,1e6")
+    parser.add_argument('--months', type=int, default=36, help="每个数据中心的月数")
+    parser.add_argument('--stages', default=','.join(STAGES), help="要测量的阶段，逗号分隔")
+    parser.add_argument('--repeat', type=int, default=3, help="每个阶段重复次数，取最快一次")
+    parser.add_argument('--excel-max-rows', type=int, default=EXCEL_MAX_ROWS, help="Excel阶段的最大行数")
+    parser.add_argument('--output', default='bench_results.jsonl', help="结果追加写入的JSON lines文件")
+    parser.add_argument('--baseline', help="用于比较的基线JSON lines文件")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="允许的吞吐下降比例")
+    args = parser.parse_args(argv)
+
+    sizes = [int(float(size)) for size in args.sizes.split(',')]
+    stages = [stage for stage in args.stages.split(',') if stage]
+    unknown = [stage for stage in stages if stage not in STAGES]
+    if unknown:
+        parser.error(f"未知阶段: {', '.join(unknown)}")
+
+    records = run_benchmarks(sizes, stages, args.months, args.repeat, args.excel_max_rows)
+    with open(args.output, 'a', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    if args.baseline:
+        regressions = find_regressions(records, read_jsonl(args.baseline), args.tolerance)
+        for stage, rows, expected, actual in regressions:
+            print(f"性能回退: {stage} @ {rows:,} 行，基线 {expected:,.0f} 行/秒，当前 {actual:,.0f} 行/秒", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,93 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+# 按内容寻址的LRU缓存 - 以字节预算限制内存占用，可跨会话共享
+
+
+def content_hash(data):
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+# 数据帧内容指纹，用于结果相关缓存的键
+def frame_fingerprint(df):
+    hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    return content_hash(hashes.tobytes() + "\x1f".join(map(str, df.columns)).encode())
+
+
+def frame_nbytes(df):
+    return int(df.memory_usage(deep=True, index=True).sum())
+
+
+class LRUCache:
+    def __init__(self, max_bytes, sizeof=frame_nbytes):
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        # 正在创建中的键，同一键的并发请求等待首个请求创建完成
+        self._pending = {}
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, key):
+        return key in self._items
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._items:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self._items.move_to_end(key)
+            return self._items[key][0]
+
+    def put(self, key, value):
+        size = self.sizeof(value)
+        with self._lock:
+            if key in self._items:
+                self.nbytes -= self._items.pop(key)[1]
+            # 超出预算的单项不缓存
+            if size > self.max_bytes:
+                return value
+            self._items[key] = (value, size)
+            self.nbytes += size
+            # 淘汰最久未使用的项直至回到预算内
+            while self.nbytes > self.max_bytes:
+                _, (_, evicted) = self._items.popitem(last=False)
+                self.nbytes -= evicted
+        return value
+
+    def get_or_create(self, key, factory):
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        with self._lock:
+            key_lock = self._pending.setdefault(key, threading.Lock())
+        try:
+            with key_lock:
+                # 等待期间其他线程可能已创建完成
+                with self._lock:
+                    if key in self._items:
+                        self.hits += 1
+                        self._items.move_to_end(key)
+                        return self._items[key][0]
+                return self.put(key, factory())
+        finally:
+            with self._lock:
+                if self._pending.get(key) is key_lock:
+                    del self._pending[key]
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self.nbytes = 0
+
+
+_MISSING = object()
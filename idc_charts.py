@@ -0,0 +1,83 @@
+import numpy as np
+import plotly.graph_objects as go
+
+# 图表数据处理 - 长序列按最大三角形三桶法（LTTB）降采样，保留峰谷形态；点数较多时切换WebGL渲染
+
+# 每条曲线发送到浏览器的最大点数
+MAX_POINTS_PER_TRACE = 1500
+# 单个图表总点数超过该值时使用WebGL（Scattergl）渲染
+WEBGL_POINT_THRESHOLD = 5000
+
+# SVG可直接使用CSS变量颜色，WebGL需换成具体色值
+THEME_COLORS = {
+    'var(--primary)': '#165DFF',
+    'var(--danger)': '#FF4D4F',
+    'var(--success)': '#52C41A',
+    'var(--warning)': '#FAAD14'
+}
+
+
+def use_webgl(n_points, threshold=WEBGL_POINT_THRESHOLD):
+    return n_points > threshold
+
+
+def theme_color(color, webgl):
+    return THEME_COLORS.get(color, color) if webgl else color
+
+
+# 轨迹属性的数据量：数值数组按实际字节数，列表逐项累计（每个标量约16字节），嵌套属性递归统计
+def _payload_nbytes(value):
+    if isinstance(value, np.ndarray):
+        if value.dtype != object:
+            return value.nbytes
+        value = value.ravel().tolist()
+    if isinstance(value, dict):
+        return sum(_payload_nbytes(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(_payload_nbytes(item) for item in value)
+    if isinstance(value, str):
+        return len(value.encode('utf-8'))
+    return 16
+
+
+# 图表对象内存估算：统计各轨迹所有属性（x/y、热力图z、customdata、文本与颜色数组等），另加布局的固定开销
+def figure_nbytes(fig):
+    return sum(_payload_nbytes(trace.to_plotly_json()) for trace in fig.data) + 16 * 1024
+
+
+# 按渲染模式创建折线轨迹，样式参数保持一致
+def scatter_trace(webgl, line=None, marker=None, **kwargs):
+    if webgl:
+        line = line and {**line, 'color': theme_color(line.get('color'), True)}
+        marker = marker and {**marker, 'color': theme_color(marker.get('color'), True)}
+    trace_cls = go.Scattergl if webgl else go.Scatter
+    return trace_cls(line=line, marker=marker, **kwargs)
+
+
+# 返回LTTB选中点的位置，首尾两点固定保留，空值点不参与选择
+def lttb_indices(x, y, n_out=MAX_POINTS_PER_TRACE):
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    finite = np.flatnonzero(np.isfinite(x) & np.isfinite(y))
+    n = len(finite)
+    if n_out >= n or n_out < 3:
+        return finite
+    x, y = x[finite], y[finite]
+
+    # 中间点划分为 n_out-2 个桶，最后一个“桶”为末尾点
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    counts = np.diff(edges)
+    avg_x = np.append(np.add.reduceat(x[:-1], edges[:-1]) / counts, x[-1])
+    avg_y = np.append(np.add.reduceat(y[:-1], edges[:-1]) / counts, y[-1])
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, stop = edges[i], edges[i + 1]
+        # 与上一选中点、下一桶均值构成的三角形面积最大者入选
+        area = np.abs((x[a] - avg_x[i + 1]) * (y[start:stop] - y[a])
+                      - (x[a] - x[start:stop]) * (avg_y[i + 1] - y[a]))
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return finite[selected]
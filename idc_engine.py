@@ -0,0 +1,510 @@
+import hashlib
+import json
+import numpy as np
+import pandas as pd
+from datetime import timedelta
+
+# IDC销售健康度计算引擎 - 不依赖Streamlit，可供页面与批处理共用
+
+# 必要数据列
+REQUIRED_COLUMNS = ['月份', '服务器利用率', '带宽利用率', '机柜利用率', '新客户数量',
+                    '客户流失率', '平均合同期限', '月收入(万元)', '利润率',
+                    '应收账款周转天数', '高风险客户占比', '服务中断次数',
+                    '市场增长率', '销售漏斗数量']
+METRIC_COLUMNS = REQUIRED_COLUMNS[1:]
+
+# 多数据中心长表的站点键，缺失时视为单一数据中心
+SITE_COLUMN = '数据中心'
+DEFAULT_SITE = '全部'
+
+# 读取时指标列中无法解析为数值的单元格按空值处理，各列数量记在 DataFrame.attrs 的该键下
+NON_NUMERIC_ATTR = 'non_numeric'
+
+# 评分规则格式版本
+SPEC_FORMAT = 1
+# 默认评分规则：每个维度由若干指标项加权组成，指标项按 range 线性映射到0-100分
+# range 为 [记0分的取值, 记100分的取值]，越小越好的指标两端反过来写
+DEFAULT_SCORING_SPEC = {
+    'format': SPEC_FORMAT,
+    'name': "默认评分规则",
+    'version': "1.0",
+    'dimensions': {
+        '资源利用': {'weight': 0.25, 'terms': [
+            {'metric': '服务器利用率', 'weight': 0.4, 'range': [0, 100]},
+            {'metric': '带宽利用率', 'weight': 0.4, 'range': [0, 100]},
+            {'metric': '机柜利用率', 'weight': 0.2, 'range': [0, 100]}
+        ]},
+        '客户健康': {'weight': 0.25, 'terms': [
+            {'metric': '客户流失率', 'weight': 0.4, 'range': [100, 0]},
+            {'metric': '平均合同期限', 'weight': 0.4, 'range': [0, 36]},
+            {'metric': '新客户数量', 'weight': 0.2, 'range': [0, 25]}
+        ]},
+        '财务健康': {'weight': 0.20, 'terms': [
+            {'metric': '利润率', 'weight': 0.5, 'range': [0, 100]},
+            {'metric': '应收账款周转天数', 'weight': 0.3, 'range': [100, 0]},
+            {'metric': '月收入(万元)', 'weight': 0.2, 'range': [0, 400]}
+        ]},
+        '风险控制': {'weight': 0.15, 'terms': [
+            {'metric': '高风险客户占比', 'weight': 0.5, 'range': [100, 0]},
+            {'metric': '服务中断次数', 'weight': 0.5, 'range': [10, 0]}
+        ]},
+        '增长潜力': {'weight': 0.15, 'terms': [
+            {'metric': '市场增长率', 'weight': 0.5, 'range': [0, 5]},
+            {'metric': '销售漏斗数量', 'weight': 0.5, 'range': [0, 100]}
+        ]}
+    }
+}
+
+# 默认权重定义
+DEFAULT_WEIGHTS = {dim: config['weight'] for dim, config in DEFAULT_SCORING_SPEC['dimensions'].items()}
+DIMENSIONS = list(DEFAULT_WEIGHTS)
+SCORE_COLUMNS = [f"{dim}得分" for dim in DIMENSIONS]
+# 评分派生列，得分以float32存储，等级以类别存储
+GRADE_LEVELS = ['优秀', '良好', '一般', '危险', '未知']
+DERIVED_COLUMNS = SCORE_COLUMNS + ['健康度总分', '健康度等级']
+
+# 可预测指标
+FORECAST_METRICS = ['健康度总分', '服务器利用率', '带宽利用率', '机柜利用率',
+                    '客户流失率', '月收入(万元)', '利润率', '销售漏斗数量']
+# 预测值截断范围
+PERCENT_METRICS = ['服务器利用率', '带宽利用率', '机柜利用率', '利润率', '高风险客户占比', '客户流失率', '健康度总分']
+NON_NEGATIVE_METRICS = ['服务中断次数']
+# 默认回归窗口与最大预测周期（月）
+FORECAST_LOOKBACK = 6
+FORECAST_HORIZON = 12
+# 残差自助法预测区间的重抽样次数与置信水平
+BOOTSTRAP_SAMPLES = 2000
+INTERVAL_LEVEL = 0.9
+# 自助法路径按序列分块计算，每块元素数上限，分块保持在CPU缓存内
+BOOTSTRAP_CHUNK_ELEMENTS = 384_000
+# 权重敏感性分析的默认抽样次数，行×抽样的总分矩阵按行分块计算，每块元素数上限
+# 分块保持在CPU缓存内，乘法、比较与计数都不回写内存
+SENSITIVITY_SAMPLES = 20_000
+SENSITIVITY_CHUNK_ELEMENTS = 320_000
+# 分位数需排序，只取前若干次抽样估计（抽样独立同分布，前k次即随机子样本）
+SENSITIVITY_QUANTILE_SAMPLES = 4000
+# 各等级的总分下限（优秀、良好、一般），低于最后一档为危险
+GRADE_THRESHOLDS = [85, 70, 50]
+
+
+class MissingColumnsError(ValueError):
+    def __init__(self, missing):
+        self.missing = list(missing)
+        super().__init__(self.missing)
+
+    def __str__(self):
+        return f"缺少必要列: {', '.join(self.missing)}"
+
+
+def missing_columns(columns):
+    return [col for col in REQUIRED_COLUMNS if col not in columns]
+
+
+class ScoringSpecError(ValueError):
+    pass
+
+
+# 评分规则：校验后编译为系数矩阵与偏移向量，维度得分 = 指标矩阵 @ 系数 + 偏移
+class ScoringSpec:
+    def __init__(self, spec):
+        self.spec = json.loads(json.dumps(spec, ensure_ascii=False))
+        if self.spec.get('format') != SPEC_FORMAT:
+            raise ScoringSpecError(f"不支持的评分规则格式版本: {self.spec.get('format')}")
+        dimensions = self.spec.get('dimensions', {})
+        if sorted(dimensions) != sorted(DIMENSIONS):
+            raise ScoringSpecError(f"评分规则的维度须为: {', '.join(DIMENSIONS)}")
+        dimensions = self.spec['dimensions'] = {dim: dimensions[dim] for dim in DIMENSIONS}
+        self.name = self.spec.get('name', "未命名评分规则")
+        self.version = str(self.spec.get('version', ""))
+        self.weights = {dim: float(config['weight']) for dim, config in dimensions.items()}
+        if min(self.weights.values()) <= 0 or not np.isclose(sum(self.weights.values()), 1):
+            raise ScoringSpecError("维度权重须为正数且合计为1")
+
+        terms = [(j, term) for j, config in enumerate(dimensions.values()) for term in config['terms']]
+        unknown = sorted({term['metric'] for _, term in terms} - set(METRIC_COLUMNS))
+        if unknown:
+            raise ScoringSpecError(f"评分规则包含未知指标: {', '.join(unknown)}")
+        self.metrics = [col for col in METRIC_COLUMNS if any(term['metric'] == col for _, term in terms)]
+
+        # 指标项得分 = (x - low) / (high - low) * 100，按项权重累加到所属维度
+        self.coef = np.zeros((len(self.metrics), len(DIMENSIONS)))
+        self.offset = np.zeros(len(DIMENSIONS))
+        for j, term in terms:
+            low, high = map(float, term['range'])
+            if low == high:
+                raise ScoringSpecError(f"{term['metric']} 的取值范围两端不能相同")
+            scale = float(term['weight']) * 100 / (high - low)
+            self.coef[self.metrics.index(term['metric']), j] += scale
+            self.offset[j] -= scale * low
+        for dim, config in dimensions.items():
+            if not np.isclose(sum(float(term['weight']) for term in config['terms']), 1):
+                raise ScoringSpecError(f"{dim} 的指标项权重合计须为1")
+        self.key = hashlib.blake2b(self.to_json().encode('utf-8'), digest_size=16).hexdigest()
+
+    @classmethod
+    def load(cls, source):
+        if hasattr(source, 'read'):
+            source = source.read()
+        elif not str(source).lstrip().startswith('{'):
+            with open(source, encoding='utf-8') as f:
+                source = f.read()
+        try:
+            return cls(json.loads(source))
+        except ScoringSpecError:
+            raise
+        except (KeyError, TypeError, ValueError) as e:
+            raise ScoringSpecError(f"评分规则文件格式错误: {e}") from e
+
+    def to_json(self):
+        return json.dumps(self.spec, ensure_ascii=False, indent=2)
+
+    # 未加权的各维度得分 (行, 维度)；某维度用到的指标为空时该维度得分为空
+    def dimension_scores(self, X):
+        missing = np.isnan(X)
+        if not missing.any():
+            return X @ self.coef + self.offset
+        scores = np.where(missing, 0, X) @ self.coef + self.offset
+        scores[missing @ (self.coef != 0)] = np.nan
+        return scores
+
+
+DEFAULT_SPEC = ScoringSpec(DEFAULT_SCORING_SPEC)
+
+
+# 健康度计算函数，只返回派生列，与df同索引
+# 一次矩阵乘法求出所有行的维度得分，weights 可覆盖规则中的维度权重
+def score_frame(df, weights=None, spec=None):
+    spec = spec or DEFAULT_SPEC
+    weights = weights or spec.weights
+    X = df[spec.metrics].to_numpy(dtype=np.float64)
+    weighted = spec.dimension_scores(X) * np.array([weights[dim] for dim in DIMENSIONS])
+    scores = pd.DataFrame(weighted.astype(np.float32), index=df.index, columns=SCORE_COLUMNS)
+
+    # 计算总分，空值维度不计入，等级按双精度总分划分
+    total = np.nansum(weighted, axis=1)
+    scores['健康度总分'] = total.astype(np.float32)
+
+    # 添加健康度等级
+    conditions = [
+        (total >= 85),
+        (total >= 70) & (total < 85),
+        (total >= 50) & (total < 70),
+        (total < 50)
+    ]
+    scores['健康度等级'] = pd.Categorical(np.select(conditions, GRADE_LEVELS[:4], default='未知'), categories=GRADE_LEVELS)
+
+    return scores
+
+
+# 在df上追加派生列
+def calculate_health_scores(df, weights=None, spec=None):
+    scores = score_frame(df, weights, spec)
+    for col in DERIVED_COLUMNS:
+        df[col] = scores[col]
+    return df
+
+
+# 结果 = 输入数据列引用 + 派生列，不复制输入数据
+def join_results(data, scores):
+    columns = {col: data[col] for col in data.columns}
+    columns.update({col: scores[col] for col in scores.columns})
+    return pd.DataFrame(columns, copy=False)
+
+
+def site_keys(df):
+    if SITE_COLUMN in df.columns:
+        return df[SITE_COLUMN].astype(object).fillna(DEFAULT_SITE).astype(str)
+    return pd.Series(DEFAULT_SITE, index=df.index, name=SITE_COLUMN)
+
+
+# 按数据中心汇总最新值与环比变化，一次排序完成所有站点的分组计算
+# 返回 (汇总表, 各站点按月份排序后的行位置)
+def summarize_sites(df):
+    keys = site_keys(df).to_numpy()
+    order = (pd.DataFrame({'site': keys, 'month': df['月份'].to_numpy()})
+             .sort_values(['site', 'month'], kind='stable').index.to_numpy())
+    ordered_keys = keys[order]
+
+    # 各站点在排序结果中的起止位置
+    starts = np.flatnonzero(np.r_[True, ordered_keys[1:] != ordered_keys[:-1]])
+    stops = np.r_[starts[1:], len(order)]
+    sites = pd.Index(ordered_keys[starts], name=SITE_COLUMN)
+
+    # 仅有一个月数据的站点以当月作为上期
+    latest = df.iloc[order[stops - 1]].set_axis(sites)
+    previous = df.iloc[order[np.maximum(stops - 2, starts)]].set_axis(sites)
+    numeric = latest.select_dtypes('number').columns.drop(SITE_COLUMN, errors='ignore')
+
+    summary = pd.concat([
+        latest,
+        previous[numeric].add_prefix('上期'),
+        (latest[numeric] - previous[numeric]).add_prefix('环比')
+    ], axis=1)
+    summary['月数'] = stops - starts
+    site_rows = {site: order[start:stop] for site, start, stop in zip(sites, starts, stops)}
+    return summary, site_rows
+
+
+# 合并数据帧，站点类别列先统一类别以免退化为object，各帧的非数值单元格计数相加
+def concat_frames(frames):
+    sites = [df[SITE_COLUMN] for df in frames if SITE_COLUMN in df.columns]
+    if len(sites) == len(frames) and all(isinstance(site.dtype, pd.CategoricalDtype) for site in sites):
+        categories = pd.api.types.union_categoricals(sites).categories
+        frames = [df.assign(**{SITE_COLUMN: df[SITE_COLUMN].cat.set_categories(categories)}) for df in frames]
+    non_numeric = {}
+    for df in frames:
+        for col, count in df.attrs.get(NON_NUMERIC_ATTR, {}).items():
+            non_numeric[col] = non_numeric.get(col, 0) + count
+    combined = pd.concat(frames, ignore_index=True)
+    combined.attrs = {NON_NUMERIC_ATTR: non_numeric} if non_numeric else {}
+    return combined
+
+
+# 追加新月份：只对新增行评分，并以各站点原最新行作为上期更新汇总
+# 新增月份不晚于已有月份（即历史数据变化）时返回None，由调用方全量重算
+def append_scores(results, summary, site_rows, new_rows, weights=None, spec=None):
+    scored = calculate_health_scores(new_rows.copy(), weights, spec)
+    keys = site_keys(scored)
+    last_month = summary['月份'].reindex(keys).to_numpy()
+    if (scored['月份'].to_numpy() <= last_month).any():
+        return None
+
+    known = summary.index.intersection(keys.unique())
+    anchors = results.iloc[[site_rows[site][-1] for site in known]]
+    part_summary, part_rows = summarize_sites(concat_frames([anchors, scored]))
+    part_summary['月数'] += summary['月数'].reindex(part_summary.index, fill_value=1) - 1
+
+    # 局部行位置换算为合并后结果中的位置
+    offset = len(results) - len(anchors)
+    site_rows = dict(site_rows)
+    for site, rows in part_rows.items():
+        appended = rows[rows >= len(anchors)] + offset
+        site_rows[site] = np.concatenate([site_rows[site], appended]) if site in known else appended
+
+    combined = concat_frames([results, scored])
+    unchanged = summary.drop(part_summary.index, errors='ignore')
+    summary = pd.concat([unchanged, part_summary]).sort_index() if len(unchanged) else part_summary
+    return combined, summary, site_rows
+
+
+# 在单纯形上抽样维度权重 (n, 维度)：concentration 为空时均匀抽样，
+# 否则按 Dirichlet(base * concentration) 围绕基准权重扰动，集中度越大越贴近基准
+def sample_weights(n, base=None, concentration=None, seed=0):
+    rng = np.random.default_rng(seed)
+    if concentration is None:
+        alpha = np.ones(len(DIMENSIONS))
+    else:
+        base = base or DEFAULT_WEIGHTS
+        alpha = np.array([base[dim] for dim in DIMENSIONS]) * concentration
+    return rng.dirichlet(alpha, size=n)
+
+
+# 权重敏感性：总分 = 维度得分 @ 权重，均值与方差按抽样权重的均值、协方差闭式求出；
+# 等级概率与分位数需逐个抽样计算，按行分块做矩阵乘法。rows 为要分析的行位置，默认全部行
+def weight_sensitivity(df, W, spec=None, rows=None):
+    spec = spec or DEFAULT_SPEC
+    if rows is not None:
+        df = df.iloc[rows]
+    dims = spec.dimension_scores(df[spec.metrics].to_numpy(dtype=np.float64))
+    dims = np.nan_to_num(dims)
+    W = np.asarray(W, dtype=np.float64)
+    means = dims @ W.mean(axis=0)
+    variances = np.einsum('ij,jk,ik->i', dims, np.cov(W, rowvar=False, bias=True).reshape(W.shape[1], -1), dims)
+    stds = np.sqrt(np.maximum(variances, 0))
+
+    dims = dims.astype(np.float32)
+    weights_t = np.ascontiguousarray(W.T, dtype=np.float32)
+    n = len(dims)
+    levels = GRADE_LEVELS[:4]
+    counts = np.empty((n, len(GRADE_THRESHOLDS)), dtype=np.int64)
+    # 分位数取排序后子样本的相邻两项线性插值，与 np.quantile 默认方法一致
+    k = min(len(W), SENSITIVITY_QUANTILE_SAMPLES)
+    positions = np.array([0.05, 0.5, 0.95]) * (k - 1)
+    lower = np.floor(positions).astype(np.int64)
+    upper = np.minimum(lower + 1, k - 1)
+    fraction = positions - lower
+    quantiles = np.empty((n, 3))
+    step = max(1, SENSITIVITY_CHUNK_ELEMENTS // max(1, len(W)))
+    for start in range(0, n, step):
+        totals = dims[start:start + step] @ weights_t
+        # 不低于各档下限的抽样数，布尔矩阵按字节求和比 count_nonzero 按行计数快
+        for j, t in enumerate(GRADE_THRESHOLDS):
+            counts[start:start + step, j] = np.add.reduce((totals >= t).view(np.uint8), axis=1, dtype=np.int64)
+        ordered = np.sort(totals[:, :k], axis=1)
+        quantiles[start:start + step] = ordered[:, lower] * (1 - fraction) + ordered[:, upper] * fraction
+    # 相邻两档相减得到各等级概率
+    probs = np.diff(counts / len(W), axis=1, prepend=0, append=1)
+
+    result = pd.DataFrame(probs, index=df.index, columns=[f"{level}概率" for level in levels])
+    if '健康度等级' in df.columns:
+        current = pd.Categorical(df['健康度等级'], categories=levels).codes
+        result['等级稳定概率'] = np.where(current >= 0, probs[np.arange(n), np.maximum(current, 0)], np.nan)
+    result['总分均值'] = means
+    result['总分标准差'] = stds
+    result['总分P5'], result['总分P50'], result['总分P95'] = quantiles.T
+    return result
+
+
+# 风险规则：指标、比较方向、阈值、风险名称、说明模板与严重程度
+RISK_RULES = [
+    dict(metric='客户流失率', op='>', threshold=3.0, title="客户流失率过高",
+         detail="当前流失率 {value:.1f}%，高于3%的安全阈值", severity="高"),
+    dict(metric='高风险客户占比', op='>', threshold=10.0, title="高风险客户过多",
+         detail="高风险客户占比 {value:.1f}%，高于10%的安全阈值", severity="高"),
+    dict(metric='应收账款周转天数', op='>', threshold=45.0, title="回款周期过长",
+         detail="应收账款周转天数 {value:g}天，高于45天的安全阈值", severity="中"),
+    dict(metric='服务中断次数', op='>', threshold=1.0, title="服务稳定性问题",
+         detail="服务中断次数 {value:g}次，影响客户满意度", severity="高"),
+    dict(metric='销售漏斗数量', op='<', threshold=40.0, title="销售机会不足",
+         detail="销售漏斗数量仅 {value:g}，低于40的安全阈值", severity="中")
+]
+RISK_TITLES = [rule['title'] for rule in RISK_RULES]
+
+
+# 所有规则对所有行一次求值，返回与df同索引、每条规则一列的布尔表；空值不触发风险
+def risk_masks(df, rules=RISK_RULES):
+    values = df[[rule['metric'] for rule in rules]].to_numpy(dtype=float)
+    thresholds = np.array([rule['threshold'] for rule in rules])
+    above = np.array([rule['op'] == '>' for rule in rules])
+    masks = np.where(above, values > thresholds, values < thresholds)
+    return pd.DataFrame(masks, index=df.index, columns=[rule['title'] for rule in rules])
+
+
+# 识别主要风险点，返回 (风险, 详情, 等级) 列表
+def evaluate_risks(latest_data, rules=RISK_RULES):
+    triggered = risk_masks(latest_data.to_frame().T, rules).iloc[0]
+    return [(rule['title'], rule['detail'].format(value=latest_data[rule['metric']]), rule['severity'])
+            for rule in rules if triggered[rule['title']]]
+
+
+# 各站点风险统计：每条规则触发的月数，以及最新一期的风险点数量
+def site_risk_counts(results, summary, masks=None, rules=RISK_RULES):
+    masks = risk_masks(results, rules) if masks is None else masks
+    counts = masks.groupby(site_keys(results).to_numpy()).sum().reindex(summary.index, fill_value=0)
+    counts.insert(0, '当前风险点数', risk_masks(summary, rules).sum(axis=1))
+    return counts
+
+
+# 确保预测值在合理范围内
+def clip_forecast(metric, values):
+    if metric in PERCENT_METRICS:
+        return np.clip(values, 0, 100)
+    if metric in NON_NEGATIVE_METRICS:
+        return np.clip(values, 0, None)
+    return values
+
+
+def _clip_bounds(metrics):
+    lower = np.array([0 if m in PERCENT_METRICS or m in NON_NEGATIVE_METRICS else -np.inf for m in metrics])
+    upper = np.array([100 if m in PERCENT_METRICS else np.inf for m in metrics])
+    return lower, upper
+
+
+# 批量线性趋势拟合：Y每行一条序列，一次最小二乘求解所有序列的斜率与截距，返回后续horizon期预测
+def fit_linear_trends(Y, horizon):
+    n = Y.shape[1]
+    if n < 2:
+        return np.repeat(Y[:, -1:], horizon, axis=1)
+    X = np.column_stack([np.arange(n), np.ones(n)])
+    coeff = Y @ np.linalg.pinv(X).T
+    steps = np.arange(n, n + horizon)
+    return coeff[:, :1] * steps + coeff[:, 1:]
+
+
+# 残差自助法预测区间：所有序列共用同一组重抽样下标，
+# 重抽样残差对斜率与截距的影响等于残差乘以计数权重矩阵，再叠加重抽样的未来残差，
+# 每条模拟路径都是残差的线性组合，一次矩阵乘法得到一块序列的全部路径
+def bootstrap_linear_intervals(Y, horizon, n_boot=BOOTSTRAP_SAMPLES, level=INTERVAL_LEVEL, seed=0):
+    n_series, n = Y.shape
+    # 少于3个点时残差恒为0，区间退化为点预测
+    if n < 3:
+        point = fit_linear_trends(Y, horizon)
+        return point, point
+    X = np.column_stack([np.arange(n), np.ones(n)])
+    pinv = np.linalg.pinv(X)
+    coeff = Y @ pinv.T
+    # 按自由度放大残差，补偿拟合残差偏小
+    resid = (Y - coeff @ X.T) * np.sqrt(n / (n - 2))
+
+    rng = np.random.default_rng(seed)
+    draws = rng.integers(0, n, size=(n_boot, n))
+    flat = (np.arange(n_boot)[:, None] * n + draws).ravel()
+    slope_w, intercept_w = (np.bincount(flat, np.tile(row, n_boot), minlength=n_boot * n).reshape(n_boot, n)
+                            for row in pinv)
+    noise = rng.integers(0, n, size=(n_boot, horizon))
+    steps = np.arange(n, n + horizon)
+    # 路径系数 (残差, 预测期, 重抽样)：第h期第b次路径 = 点预测 + resid @ paths_w[:, h, b]
+    paths_w = slope_w.T[:, None, :] * steps[:, None] + intercept_w.T[:, None, :]
+    paths_w += np.arange(n)[:, None, None] == noise.T[None, :, :]
+    paths_w = paths_w.reshape(n, -1).astype(np.float32)
+    point = coeff[:, :1] * steps + coeff[:, 1:]
+
+    # 分位数取排序后相邻两项线性插值，与 np.quantile 默认方法一致
+    positions = np.array([(1 - level) / 2, (1 + level) / 2]) * (n_boot - 1)
+    below = np.floor(positions).astype(np.int64)
+    above = np.minimum(below + 1, n_boot - 1)
+    fraction = positions - below
+
+    lower = np.empty((n_series, horizon))
+    upper = np.empty((n_series, horizon))
+    chunk = max(1, BOOTSTRAP_CHUNK_ELEMENTS // (n_boot * horizon))
+    for start in range(0, n_series, chunk):
+        part = slice(start, start + chunk)
+        # (序列, 预测期, 重抽样) 的残差扰动，按重抽样排序
+        paths = np.sort((resid[part].astype(np.float32) @ paths_w).reshape(-1, horizon, n_boot), axis=2)
+        bounds = paths[:, :, below] * (1 - fraction) + paths[:, :, above] * fraction
+        lower[part] = point[part] + bounds[:, :, 0]
+        upper[part] = point[part] + bounds[:, :, 1]
+    return lower, upper
+
+
+# 简单线性预测，使用最后lookback个月数据
+def forecast_metric(values, periods, metric=None, lookback=FORECAST_LOOKBACK):
+    y = np.asarray(values, dtype=float)[-lookback:]
+    return clip_forecast(metric, fit_linear_trends(y[None, :], periods)[0])
+
+
+# 所有站点、所有指标的批量预测，按历史长度分组后每组一次求解
+# 返回以 (数据中心, 指标) 为索引、1..horizon 为列的预测表
+def forecast_all(results, site_rows, metrics=FORECAST_METRICS, lookback=FORECAST_LOOKBACK,
+                 horizon=FORECAST_HORIZON):
+    metrics = list(metrics)
+    lower, upper = _clip_bounds(metrics)
+    frames = []
+    for sites, Y in _tail_groups(results, site_rows, metrics, lookback):
+        forecast = fit_linear_trends(Y, horizon).reshape(len(sites), len(metrics), horizon)
+        forecast = np.clip(forecast, lower[:, None], upper[:, None])
+        index = pd.MultiIndex.from_product([sites, metrics], names=[SITE_COLUMN, '指标'])
+        frames.append(pd.DataFrame(forecast.reshape(-1, horizon), index=index, columns=range(1, horizon + 1)))
+    return pd.concat(frames).sort_index() if len(frames) > 1 else frames[0]
+
+
+# 所有站点、所有指标的自助法预测区间，索引同forecast_all，列为 (下限/上限, 1..horizon)
+def forecast_intervals(results, site_rows, metrics=FORECAST_METRICS, lookback=FORECAST_LOOKBACK,
+                       horizon=FORECAST_HORIZON, n_boot=BOOTSTRAP_SAMPLES, level=INTERVAL_LEVEL, seed=0):
+    metrics = list(metrics)
+    lower_clip, upper_clip = _clip_bounds(metrics)
+    columns = pd.MultiIndex.from_product([['下限', '上限'], range(1, horizon + 1)])
+    frames = []
+    for sites, Y in _tail_groups(results, site_rows, metrics, lookback):
+        bounds = np.hstack(bootstrap_linear_intervals(Y, horizon, n_boot, level, seed))
+        bounds = bounds.reshape(len(sites), len(metrics), 2 * horizon)
+        bounds = np.clip(bounds, lower_clip[:, None], upper_clip[:, None])
+        index = pd.MultiIndex.from_product([sites, metrics], names=[SITE_COLUMN, '指标'])
+        frames.append(pd.DataFrame(bounds.reshape(-1, 2 * horizon), index=index, columns=columns))
+    return pd.concat(frames).sort_index() if len(frames) > 1 else frames[0]
+
+
+# 按最近lookback期的长度对站点分组，每组返回 (站点列表, 站点×指标行、月份列的矩阵)
+def _tail_groups(results, site_rows, metrics, lookback):
+    tails = {site: rows[-lookback:] for site, rows in site_rows.items()}
+    for length in sorted({len(rows) for rows in tails.values()}):
+        sites = [site for site, rows in tails.items() if len(rows) == length]
+        positions = np.concatenate([tails[site] for site in sites])
+        # (站点, 月份, 指标) -> (站点×指标, 月份)
+        block = results.iloc[positions, results.columns.get_indexer(metrics)].to_numpy(dtype=float)
+        yield sites, block.reshape(len(sites), length, len(metrics)).transpose(0, 2, 1).reshape(-1, length)
+
+
+def forecast_dates(last_date, periods):
+    return [last_date + timedelta(days=30*i) for i in range(1, periods+1)]
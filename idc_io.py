@@ -0,0 +1,277 @@
+import io
+from itertools import islice, zip_longest
+from pathlib import Path
+
+import numpy as np
+import openpyxl
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from pandas.api.types import union_categoricals
+
+from idc_engine import (METRIC_COLUMNS, NON_NUMERIC_ATTR, REQUIRED_COLUMNS, SITE_COLUMN, MissingColumnsError,
+                        missing_columns)
+
+# 数据文件读取 - 先校验表头，再只读取所需列，CSV按块流式解析，Parquet/Arrow按列读取
+# 传入 summary（idc_profile.StreamingSummary）时，读取过程中逐块更新摘要统计草图
+# 报告写出 - Excel以只写模式按块逐行写出，内存占用与数据量无关
+
+CSV_CHUNK_ROWS = 200_000
+EXCEL_BLOCK_ROWS = 10_000
+
+# 紧凑数据类型声明；指标列先按原样解析，再宽松转换为float32
+COLUMN_DTYPES = {col: 'float32' for col in METRIC_COLUMNS}
+COLUMN_DTYPES[SITE_COLUMN] = 'category'
+# CSV解析时只声明站点列，指标列由解析器推断，含非数值时为object
+CSV_PARSE_DTYPES = {SITE_COLUMN: 'category'}
+
+
+def _rewind(source):
+    if hasattr(source, 'seek'):
+        source.seek(0)
+
+
+# 单列宽松转为float32：无法解析为数值的单元格记为空值，返回 (数值, 非数值单元格数)
+def _to_float32(values):
+    try:
+        return np.asarray(values, dtype=np.float32), 0
+    except (ValueError, TypeError):
+        raw = pd.Series(values, dtype=object)
+        numeric = pd.to_numeric(raw, errors='coerce')
+        return numeric.to_numpy(dtype=np.float32), int((numeric.isna() & raw.notna()).sum())
+
+
+# 指标列宽松转换，非数值单元格数按列累计到 non_numeric
+def _coerce_metrics(df, non_numeric):
+    for col in METRIC_COLUMNS:
+        if col in df.columns and df[col].dtype != np.float32:
+            values, count = _to_float32(df[col].to_numpy())
+            df[col] = values
+            if count:
+                non_numeric[col] = non_numeric.get(col, 0) + count
+    return df
+
+
+def _mark_non_numeric(df, non_numeric):
+    if non_numeric:
+        df.attrs[NON_NUMERIC_ATTR] = non_numeric
+    return df
+
+
+# 校验表头并返回需要读取的列
+def select_columns(columns):
+    missing = missing_columns(columns)
+    if missing:
+        raise MissingColumnsError(missing)
+    return REQUIRED_COLUMNS + ([SITE_COLUMN] if SITE_COLUMN in columns else [])
+
+
+def read_csv_header(source):
+    _rewind(source)
+    columns = pd.read_csv(source, nrows=0).columns
+    _rewind(source)
+    return columns
+
+
+# 合并数据块，站点列单独合并类别以避免退化为object
+def concat_chunks(chunks, columns):
+    chunks = [chunk for chunk in chunks if len(chunk)] or chunks[:1]
+    if not chunks:
+        return pd.DataFrame({col: pd.Series(dtype=COLUMN_DTYPES.get(col, 'datetime64[ns]')) for col in columns})
+    sites = [chunk.pop(SITE_COLUMN) for chunk in chunks] if SITE_COLUMN in columns else None
+    df = pd.concat(chunks, ignore_index=True)
+    if sites is not None:
+        df[SITE_COLUMN] = union_categoricals(sites)
+    return df
+
+
+def read_csv_dataset(source, chunksize=CSV_CHUNK_ROWS, summary=None):
+    columns = select_columns(read_csv_header(source))
+    chunks, non_numeric = [], {}
+    for chunk in pd.read_csv(source, usecols=columns, dtype=CSV_PARSE_DTYPES, chunksize=chunksize):
+        chunk = _coerce_metrics(chunk, non_numeric)
+        chunk['月份'] = pd.to_datetime(chunk['月份'])
+        if summary is not None:
+            summary.update(chunk)
+        chunks.append(chunk)
+    return _mark_non_numeric(concat_chunks(chunks, columns), non_numeric)
+
+
+def _grow(buffers, capacity):
+    for col, buffer in buffers.items():
+        grown = np.empty(capacity, dtype=buffer.dtype)
+        grown[:len(buffer)] = buffer
+        buffers[col] = grown
+
+
+# 只读模式逐行流式读取Excel，不构建完整对象模型，按块写入类型化列缓冲区
+# progress(已读行数, 总行数) 在每个数据块后回调，总行数未知时为None
+def read_excel_dataset(source, progress=None, block_rows=EXCEL_BLOCK_ROWS, summary=None):
+    _rewind(source)
+    workbook = openpyxl.load_workbook(source, read_only=True, data_only=True)
+    try:
+        worksheet = workbook.worksheets[0]
+        rows = worksheet.iter_rows(values_only=True)
+        header = next(rows, ())
+        columns = select_columns([name for name in header if name is not None])
+        positions = [header.index(col) for col in columns]
+
+        total = max((worksheet.max_row or 1) - 1, 0) or None
+        capacity = total or block_rows
+        buffers = {col: np.empty(capacity, dtype=COLUMN_DTYPES[col] if col in METRIC_COLUMNS else object)
+                   for col in columns}
+
+        count, non_numeric = 0, {}
+        while block := list(islice(rows, block_rows)):
+            # 跳过整行为空的记录
+            block = [row for row in block if any(value is not None for value in row)]
+            if count + len(block) > capacity:
+                capacity = max(capacity * 2, count + len(block))
+                _grow(buffers, capacity)
+            # 按列转置，行尾缺失的单元格补为空值
+            values = list(zip_longest(*block))
+            empty = (None,) * len(block)
+            for col, pos in zip(columns, positions):
+                column = values[pos] if pos < len(values) else empty
+                if col in METRIC_COLUMNS:
+                    column, bad = _to_float32(column)
+                    if bad:
+                        non_numeric[col] = non_numeric.get(col, 0) + bad
+                buffers[col][count:count + len(block)] = np.array(column, dtype=buffers[col].dtype)
+            if summary is not None:
+                block_df = pd.DataFrame({col: buffer[count:count + len(block)] for col, buffer in buffers.items()})
+                block_df['月份'] = pd.to_datetime(block_df['月份'])
+                summary.update(block_df)
+            count += len(block)
+            if progress:
+                progress(count, total)
+    finally:
+        workbook.close()
+
+    df = pd.DataFrame({col: buffer[:count] for col, buffer in buffers.items()})
+    df['月份'] = pd.to_datetime(df['月份'])
+    if SITE_COLUMN in df:
+        df[SITE_COLUMN] = df[SITE_COLUMN].astype('category')
+    return _mark_non_numeric(df, non_numeric)
+
+
+# 列式文件按声明类型对齐，指标列宽松转换，月份保持日期类型
+def _compact(df):
+    non_numeric = {}
+    df = _coerce_metrics(df, non_numeric)
+    if SITE_COLUMN in df.columns:
+        df[SITE_COLUMN] = df[SITE_COLUMN].astype('category')
+    if not pd.api.types.is_datetime64_any_dtype(df['月份']):
+        df['月份'] = pd.to_datetime(df['月份'])
+    return _mark_non_numeric(df, non_numeric)
+
+
+def read_parquet_dataset(source):
+    _rewind(source)
+    columns = select_columns(pq.read_schema(source).names)
+    _rewind(source)
+    return _compact(pd.read_parquet(source, columns=columns))
+
+
+def read_feather_dataset(source):
+    _rewind(source)
+    with pa.ipc.open_file(source) as reader:
+        columns = select_columns(reader.schema.names)
+    _rewind(source)
+    return _compact(pd.read_feather(source, columns=columns))
+
+
+# CSV导出压缩格式与文件后缀，zstd取决于pyarrow构建是否包含该编解码器
+CSV_COMPRESSION_SUFFIXES = {'gzip': '.gz', 'zstd': '.zst'}
+
+
+def csv_compressions():
+    return [codec for codec in CSV_COMPRESSION_SUFFIXES if pa.Codec.is_available(codec)]
+
+
+# 按块写出CSV，可选gzip/zstd压缩，压缩流边写边压缩
+def to_csv_bytes(df, compression=None, chunk_rows=CSV_CHUNK_ROWS):
+    sink = pa.BufferOutputStream()
+    stream = pa.CompressedOutputStream(sink, compression) if compression else sink
+    for start in range(0, max(len(df), 1), chunk_rows):
+        chunk = df.iloc[start:start + chunk_rows].to_csv(index=False, header=start == 0)
+        stream.write(chunk.encode('utf-8'))
+    if compression:
+        stream.close()
+    return sink.getvalue().to_pybytes()
+
+
+def to_parquet_bytes(df):
+    output = io.BytesIO()
+    df.to_parquet(output, index=False, compression='zstd')
+    return output.getvalue()
+
+
+# float32按最短十进制表示转为双精度，Excel中显示2.7而非2.700000047683716
+def _shortest_float64(values):
+    values = np.asarray(values)
+    return values.astype(str).astype(np.float64) if values.dtype == np.float32 else values
+
+
+# 单列转为单元格值：数值保留numpy标量以按原精度写出，空值写为空单元格
+def _cell_values(series):
+    if pd.api.types.is_numeric_dtype(series.dtype):
+        values = list(_shortest_float64(series.to_numpy()))
+    else:
+        values = list(series.astype(object))
+    for i in np.flatnonzero(series.isna().to_numpy()):
+        values[i] = None
+    return values
+
+
+# 流式写出Excel报告：健康度数据表按块逐行写入，可选报告摘要表
+# summary为 (标题, 副标题, 站点汇总) 时写入报告摘要
+def write_excel_report(target, df, summary=None, block_rows=EXCEL_BLOCK_ROWS, progress=None):
+    workbook = openpyxl.Workbook(write_only=True)
+    data_sheet = workbook.create_sheet('健康度数据')
+    data_sheet.append(list(df.columns))
+    for start in range(0, len(df), block_rows):
+        block = df.iloc[start:start + block_rows]
+        for row in zip(*(_cell_values(block[col]) for col in block.columns)):
+            data_sheet.append(row)
+        if progress:
+            progress(min(start + block_rows, len(df)), len(df))
+
+    if summary is not None:
+        title, subtitle, site_summary = summary
+        summary_sheet = workbook.create_sheet('报告摘要')
+        summary_sheet.append([title])
+        summary_sheet.append([subtitle])
+        if len(site_summary) == 1:
+            summary_sheet.append([])
+            summary_sheet.append(["健康度总分", float(_shortest_float64(site_summary['健康度总分'].to_numpy())[0])])
+            summary_sheet.append(["健康度等级", str(site_summary['健康度等级'].iloc[0])])
+        else:
+            # 多数据中心按站点列出最新健康度
+            summary_sheet.append([])
+            summary_sheet.append(["数据中心", "健康度总分", "健康度等级"])
+            scores = _shortest_float64(site_summary['健康度总分'].to_numpy())
+            for site, score, grade in zip(site_summary.index, scores, site_summary['健康度等级']):
+                summary_sheet.append([site, float(score), str(grade)])
+    workbook.save(target)
+
+
+# 读取数据文件并校验必要列
+def read_dataset(source, name=None, progress=None, summary=None):
+    name = str(name or source)
+    # 后缀不区分大小写，与批量评分的文件筛选一致
+    suffix = Path(name).suffix.lower()
+    if suffix == '.csv':
+        return read_csv_dataset(source, summary=summary)
+    if suffix == '.xlsx':
+        return read_excel_dataset(source, progress, summary=summary)
+    if suffix == '.parquet':
+        df = read_parquet_dataset(source)
+    elif suffix in ('.feather', '.arrow'):
+        df = read_feather_dataset(source)
+    else:
+        raise ValueError(f"不支持的文件格式: {name}")
+    # 列式文件整列读取，读取后再分批更新摘要草图
+    if summary is not None:
+        summary.update(df)
+    return df
@@ -0,0 +1,92 @@
+import json
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+# 分阶段耗时统计 - 每次页面重跑记录一次，可导出为Prometheus文本或JSON lines
+
+STAGES = ('ingest', 'score', 'risk', 'forecast', 'sensitivity', 'figure', 'export')
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class StageTimer:
+    def __init__(self):
+        self.started = time.time()
+        self._start = time.perf_counter()
+        self.durations = defaultdict(float)
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.durations[name] += time.perf_counter() - start
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self._start
+
+
+class MetricsRegistry:
+    def __init__(self, history=1000):
+        self.records = deque(maxlen=history)
+        self._counts = defaultdict(lambda: [0] * (len(BUCKETS) + 1))
+        self._sums = defaultdict(float)
+        self._lock = threading.Lock()
+
+    def _observe(self, name, value):
+        counts = self._counts[name]
+        for i, bound in enumerate(BUCKETS):
+            if value <= bound:
+                counts[i] += 1
+        counts[-1] += 1
+        self._sums[name] += value
+
+    # 记录一次重跑的各阶段耗时，返回该次记录
+    def record(self, timer, page):
+        record = {
+            'timestamp': round(timer.started, 3),
+            'page': page,
+            'total': round(timer.elapsed, 6),
+            'stages': {name: round(value, 6) for name, value in timer.durations.items()}
+        }
+        with self._lock:
+            self.records.append(record)
+            self._observe(('rerun', page), record['total'])
+            for name, value in record['stages'].items():
+                self._observe(('stage', name), value)
+        return record
+
+    def to_prometheus(self):
+        lines = []
+        with self._lock:
+            for kind, metric, label in (('rerun', 'idc_rerun_duration_seconds', 'page'),
+                                        ('stage', 'idc_stage_duration_seconds', 'stage')):
+                lines.append(f"# TYPE {metric} histogram")
+                for (key_kind, value), counts in sorted(self._counts.items()):
+                    if key_kind != kind:
+                        continue
+                    for bound, count in zip(BUCKETS + ('+Inf',), counts):
+                        lines.append(f'{metric}_bucket{{{label}="{value}",le="{bound}"}} {count}')
+                    lines.append(f'{metric}_sum{{{label}="{value}"}} {self._sums[(key_kind, value)]:.6f}')
+                    lines.append(f'{metric}_count{{{label}="{value}"}} {counts[-1]}')
+        return "\n".join(lines) + "\n"
+
+    def to_jsonl(self):
+        with self._lock:
+            return "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in self.records)
+
+    # 写入Prometheus textfile采集目录，先写临时文件再替换避免读到半个文件
+    def write_prometheus(self, path):
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp_path, path)
+
+
+def append_jsonl(path, record):
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(record, ensure_ascii=False) + "\n")
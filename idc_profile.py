@@ -0,0 +1,249 @@
+import numpy as np
+import pandas as pd
+
+from idc_engine import METRIC_COLUMNS, NON_NUMERIC_ATTR, SITE_COLUMN, site_keys
+
+# 数据画像 - 导入时对每列做一次向量化扫描，汇总缺失值、取值越界、负计数、类型问题与月份顺序，结果随数据集保存
+
+# 取值范围为百分比的指标
+RANGE_LIMITS = {
+    '服务器利用率': (0, 100),
+    '带宽利用率': (0, 100),
+    '机柜利用率': (0, 100),
+    '客户流失率': (0, 100),
+    '高风险客户占比': (0, 100)
+}
+# 计数类指标，应为非负整数
+COUNT_METRICS = ['新客户数量', '服务中断次数', '销售漏斗数量']
+# 各列期望的数据类型
+EXPECTED_KINDS = {'月份': 'M', **{col: 'f' for col in METRIC_COLUMNS}}
+
+PROFILE_COLUMNS = ['类型', '缺失值', '缺失比例', '非数值', '超出范围', '超出范围比例', '负值', '非有限值', '非整数']
+
+
+# non_numeric 为读取时该列无法解析为数值、已按空值处理的单元格数，不计入缺失值
+def _column_profile(name, series, non_numeric=0):
+    values = series.to_numpy()
+    n = len(values)
+    row = dict.fromkeys(PROFILE_COLUMNS, 0)
+    row['类型'] = str(series.dtype)
+    if values.dtype.kind != EXPECTED_KINDS.get(name, values.dtype.kind):
+        row['类型'] += " ✗"
+    if values.dtype.kind == 'f':
+        missing = np.isnan(values)
+        finite = np.isfinite(values)
+        row['缺失值'] = int(missing.sum())
+        row['非有限值'] = int(n - finite.sum() - row['缺失值'])
+        if name in RANGE_LIMITS:
+            low, high = RANGE_LIMITS[name]
+            row['超出范围'] = int(np.count_nonzero(finite & ((values < low) | (values > high))))
+        if name in COUNT_METRICS:
+            row['负值'] = int(np.count_nonzero(values < 0))
+            row['非整数'] = int(np.count_nonzero(finite & (values != np.round(values))))
+    else:
+        row['缺失值'] = int(series.isna().sum())
+    row['非数值'] = int(non_numeric)
+    row['缺失值'] = max(row['缺失值'] - row['非数值'], 0)
+    row['缺失比例'] = row['缺失值'] / n if n else 0.0
+    row['超出范围比例'] = row['超出范围'] / n if n else 0.0
+    return row
+
+
+# 月份检查：同一数据中心的重复月份，以及文件顺序中月份倒退的次数
+def _month_checks(df):
+    months = df['月份'].to_numpy()
+    if months.dtype.kind != 'M':
+        return 0, 0
+    months = months.view('int64')
+    # 站点为空的行与引擎一致归入默认站点，编码均为非负
+    codes = pd.factorize(site_keys(df))[0] if SITE_COLUMN in df else np.zeros(len(df), dtype=np.int64)
+    # 按站点稳定排序后，相邻行同站点时比较月份：相等为重复，变小为倒退
+    order = np.argsort(codes, kind='stable')
+    codes, months = codes[order], months[order]
+    same = codes[1:] == codes[:-1]
+    backwards = int(np.count_nonzero(same & (months[1:] < months[:-1])))
+    # 站点与月份编码合成一个整数键，键空间不大时用计数统计重复
+    month_codes, unique_months = pd.factorize(months)
+    key = codes.astype(np.int64) * len(unique_months) + month_codes
+    if len(key) and key.min() >= 0 and (codes.max() + 1) * len(unique_months) <= max(len(key), 1 << 20) * 4:
+        duplicates = len(key) - int(np.count_nonzero(np.bincount(key)))
+    else:
+        duplicates = int(pd.Series(key).duplicated().sum())
+    return duplicates, backwards
+
+
+# 数据质量报告：各列统计表，以及 (级别, 说明) 形式的问题列表，级别为 error / warning
+def profile_dataset(df):
+    non_numeric = df.attrs.get(NON_NUMERIC_ATTR, {})
+    columns = pd.DataFrame([_column_profile(col, df[col], non_numeric.get(col, 0)) for col in df.columns],
+                           index=df.columns, columns=PROFILE_COLUMNS)
+    duplicates, backwards = _month_checks(df)
+
+    issues = []
+    missing = int(columns['缺失值'].sum())
+    if missing:
+        issues.append(('error', f"发现{missing}处缺失值"))
+    for col, row in columns.iterrows():
+        if row['类型'].endswith("✗"):
+            issues.append(('error', f"{col} 数据类型异常（{row['类型'][:-2]}）"))
+        if row['非数值']:
+            issues.append(('error', f"{col} 含 {row['非数值']} 个非数值单元格，已按空值处理"))
+        if row['非有限值']:
+            issues.append(('error', f"{col} 含 {row['非有限值']} 个无穷值"))
+        if row['超出范围']:
+            low, high = RANGE_LIMITS[col]
+            issues.append(('warning', f"{col} 有 {row['超出范围比例']:.1%} 的取值超出 {low}-{high}"))
+        if row['负值']:
+            issues.append(('error', f"{col} 含 {row['负值']} 个负值"))
+        if row['非整数']:
+            issues.append(('warning', f"{col} 含 {row['非整数']} 个非整数值"))
+    if duplicates:
+        issues.append(('error', f"发现{duplicates}条重复月份记录"))
+    if backwards:
+        issues.append(('warning', f"月份未按时间顺序排列（{backwards}处倒序）"))
+
+    return {'rows': len(df), 'columns': columns, 'duplicate_months': duplicates,
+            'unordered_months': backwards, 'issues': issues}
+
+
+# 近似分位数草图（KLL）：第h层每个保留项代表 2^h 个原始值，层满时排序后随机保留奇数位或偶数位升入上一层，
+# 越低的层容量越小；内存约为 3k 个数值，秩误差约为 1/k 量级，草图之间可以合并
+SKETCH_K = 2048
+# 大批数据按此行数分批插入草图
+SKETCH_BATCH_ROWS = 200_000
+# 超过该行数的数据集，摘要统计的分位数改用草图近似
+APPROX_SUMMARY_ROWS = 1_000_000
+# 摘要统计表的行顺序，与数值列的 DataFrame.describe() 一致
+SUMMARY_INDEX = ['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max']
+
+
+class QuantileSketch:
+    def __init__(self, k=SKETCH_K, seed=0):
+        self.k = k
+        self.rng = np.random.default_rng(seed)
+        self.levels = []
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def _capacity(self, level):
+        return max(8, int(self.k * (2 / 3) ** (len(self.levels) - level - 1)))
+
+    def _add(self, level, values):
+        while len(self.levels) <= level:
+            self.levels.append(np.empty(0))
+        self.levels[level] = np.concatenate([self.levels[level], values])
+        self._compress()
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(items)
+                # 奇数个时最大值留在本层
+                paired = len(items) // 2 * 2
+                self.levels[level] = items[paired:]
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1],
+                                                         items[self.rng.integers(2):paired:2]])
+            level += 1
+
+    # 一批数值：均值与方差按分组合并公式累计，分位数草图按批量插入
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        n = len(values)
+        if not n:
+            return
+        mean = values.mean()
+        total = self.count + n
+        delta = mean - self.mean
+        self.m2 += ((values - mean) ** 2).sum() + delta ** 2 * self.count * n / total
+        self.mean += delta * n / total
+        self.count = total
+        self.min = min(self.min, values.min())
+        self.max = max(self.max, values.max())
+
+        # 大批数据排序后每 2^h 个取一个，直接插入第h层，等价于逐层压缩
+        level = int(np.ceil(np.log2(n / self.k))) if n > self.k else 0
+        if level:
+            step = 1 << level
+            values = np.sort(values)[self.rng.integers(step)::step]
+        self._add(level, values)
+
+    def merge(self, other):
+        if not other.count:
+            return self
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.m2 += other.m2 + delta ** 2 * self.count * other.count / total
+        self.mean += delta * other.count / total
+        self.count = total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        for level, items in enumerate(other.levels):
+            self._add(level, items)
+        return self
+
+    @property
+    def std(self):
+        return np.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else np.nan
+
+    def quantiles(self, qs):
+        if not self.count:
+            return np.full(len(qs), np.nan)
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level), 2.0 ** h) for h, level in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        cumulative = np.cumsum(weights[order])
+        positions = np.searchsorted(cumulative, np.asarray(qs) * cumulative[-1], side='left')
+        values = items[order][np.minimum(positions, len(items) - 1)]
+        return np.clip(values, self.min, self.max)
+
+
+# 流式摘要统计：逐块更新各列草图，输出与 DataFrame.describe() 相同布局的摘要表
+class StreamingSummary:
+    def __init__(self, k=SKETCH_K):
+        self.k = k
+        self.rows = 0
+        self.sketches = {}
+        self.datetime_columns = set()
+
+    def update(self, df):
+        self.rows += len(df)
+        for col in df.columns:
+            values = df[col].to_numpy()
+            if values.dtype.kind == 'M':
+                self.datetime_columns.add(col)
+                # 日期按纳秒整数统计，空值（NaT）换成NaN
+                values = np.where(values.view('int64') == np.iinfo(np.int64).min, np.nan,
+                                  values.view('int64').astype(np.float64))
+            elif values.dtype.kind not in 'fiub':
+                continue
+            sketch = self.sketches.setdefault(col, QuantileSketch(self.k, seed=len(self.sketches)))
+            for start in range(0, len(values), SKETCH_BATCH_ROWS):
+                sketch.update(values[start:start + SKETCH_BATCH_ROWS])
+        return self
+
+    def merge(self, other):
+        self.rows += other.rows
+        self.datetime_columns |= other.datetime_columns
+        for col, sketch in other.sketches.items():
+            self.sketches.setdefault(col, QuantileSketch(self.k, seed=len(self.sketches))).merge(sketch)
+        return self
+
+    def describe(self):
+        columns = {}
+        for col, sketch in self.sketches.items():
+            q25, q50, q75 = sketch.quantiles([0.25, 0.5, 0.75])
+            stats = [sketch.count, sketch.mean, sketch.std, sketch.min, q25, q50, q75, sketch.max]
+            if col in self.datetime_columns:
+                # 与 pandas 一致，日期列的标准差为空
+                stats = [sketch.count] + [pd.Timestamp(int(v)) if np.isfinite(v) else pd.NaT for v in stats[1:]]
+                stats[2] = np.nan
+            columns[col] = stats
+        return pd.DataFrame(columns, index=SUMMARY_INDEX)
@@ -0,0 +1,245 @@
+import argparse
+import html
+import multiprocessing
+import sys
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from idc_charts import lttb_indices
+from idc_engine import (DEFAULT_WEIGHTS, DIMENSIONS, SCORE_COLUMNS, ScoringSpec, ScoringSpecError, evaluate_risks,
+                        join_results, score_frame, summarize_sites)
+from idc_io import read_dataset
+
+# 各数据中心批量报告 - 每个站点生成一份自包含HTML报告（内嵌SVG静态图表），多进程并行渲染后打包为zip
+# 用法: python idc_report.py 数据文件 -o 报告.zip -j 8 --title 报告标题 --company 公司名称 [--spec 评分规则.json]
+
+# 报告中每条曲线的最大点数
+REPORT_MAX_POINTS = 300
+# 每个任务包含的站点数，减少进程间调度开销
+SITES_PER_TASK = 20
+
+DIM_COLORS = ['#165DFF', '#69b1ff', '#4080FF', '#85ADFF', '#B8D0FF']
+GRADE_BANDS = [
+    (85, 100, 'rgba(82, 196, 26, 0.1)'),
+    (70, 85, 'rgba(24, 144, 255, 0.1)'),
+    (50, 70, 'rgba(250, 173, 20, 0.1)'),
+    (0, 50, 'rgba(255, 77, 79, 0.1)')
+]
+GRADE_COLORS = {'优秀': '#52C41A', '良好': '#1890FF', '一般': '#FAAD14', '危险': '#FF4D4F'}
+# 报告中列出的关键指标
+REPORT_METRICS = ['服务器利用率', '带宽利用率', '机柜利用率', '客户流失率', '月收入(万元)', '利润率',
+                  '应收账款周转天数', '高风险客户占比', '服务中断次数', '销售漏斗数量']
+
+STYLE = """
+body { font-family: 'Microsoft YaHei', 'PingFang SC', sans-serif; color: #1D2129; margin: 32px auto; max-width: 960px; }
+h1 { color: #165DFF; margin-bottom: 4px; }
+h2 { border-bottom: 2px solid #165DFF; padding-bottom: 6px; margin-top: 32px; }
+.subtitle { color: #4E5969; }
+.cards { display: flex; gap: 16px; }
+.card { flex: 1; background: #F7F8FA; border-radius: 12px; padding: 16px; text-align: center; }
+.card .label { color: #86909C; font-size: 13px; }
+.card .value { font-size: 28px; font-weight: 700; }
+table { border-collapse: collapse; width: 100%; }
+th, td { border-bottom: 1px solid #E5E6EB; padding: 6px 10px; text-align: right; }
+th:first-child, td:first-child { text-align: left; }
+.risk { border-left: 4px solid #FF4D4F; background: #FFF1F0; padding: 8px 12px; margin: 8px 0; border-radius: 4px; }
+.risk.medium { border-color: #FAAD14; background: #FFF7E8; }
+.legend span { display: inline-block; margin-right: 16px; font-size: 13px; }
+"""
+
+
+# 折线图SVG：series为 [(名称, 数值, 颜色)]，x轴按月份位置等距排列
+def svg_line_chart(months, series, y_range=(0, 100), bands=(), width=900, height=300):
+    left, right, top, bottom = 40, 10, 10, 30
+    plot_w, plot_h = width - left - right, height - top - bottom
+    y0, y1 = y_range
+    n = len(months)
+
+    def px(i):
+        return left + (plot_w * i / (n - 1) if n > 1 else plot_w / 2)
+
+    def py(value):
+        return top + plot_h * (1 - (np.clip(value, y0, y1) - y0) / (y1 - y0))
+
+    parts = [f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+             f'viewBox="0 0 {width} {height}" font-size="11" fill="#4E5969">']
+    for low, high, color in bands:
+        parts.append(f'<rect x="{left}" y="{py(high):.1f}" width="{plot_w}" height="{py(low) - py(high):.1f}" '
+                     f'fill="{color}"/>')
+    for tick in np.linspace(y0, y1, 5):
+        parts.append(f'<line x1="{left}" x2="{left + plot_w}" y1="{py(tick):.1f}" y2="{py(tick):.1f}" '
+                     f'stroke="#E5E6EB"/><text x="{left - 6}" y="{py(tick) + 4:.1f}" text-anchor="end">{tick:g}</text>')
+    for i in sorted({0, n // 2, n - 1}):
+        if n and pd.notna(months[i]):
+            parts.append(f'<text x="{px(i):.1f}" y="{height - 8}" text-anchor="middle">{months[i]:%Y-%m}</text>')
+
+    for name, values, color in series:
+        values = np.asarray(values, dtype=float)
+        keep = lttb_indices(np.arange(n), values, REPORT_MAX_POINTS)
+        # 空值处断开折线，前面空值个数相同的选中点属于同一段，孤立点画成圆点
+        gaps = np.cumsum(~np.isfinite(values))[keep]
+        for segment in np.split(keep, np.flatnonzero(np.diff(gaps)) + 1):
+            if len(segment) == 1:
+                i = segment[0]
+                parts.append(f'<circle cx="{px(i):.1f}" cy="{py(values[i]):.1f}" r="2.5" fill="{color}">'
+                             f'<title>{html.escape(name)}</title></circle>')
+            elif len(segment):
+                points = " ".join(f"{px(i):.1f},{py(values[i]):.1f}" for i in segment)
+                parts.append(f'<polyline points="{points}" fill="none" stroke="{color}" stroke-width="2.5">'
+                             f'<title>{html.escape(name)}</title></polyline>')
+    parts.append('</svg>')
+    return "".join(parts)
+
+
+def _format_change(current, previous):
+    if previous == 0 or np.isnan(previous):
+        return "-"
+    return f"{(current - previous) / abs(previous) * 100:+.1f}%"
+
+
+# 单个站点的HTML报告
+def render_site_report(site, site_df, latest, title, company, report_date, weights=None):
+    weights = weights or DEFAULT_WEIGHTS
+    months = site_df['月份'].tolist()
+    grade = str(latest['健康度等级'])
+    dim_scores = [latest[col] / weights[dim] for dim, col in zip(DIMENSIONS, SCORE_COLUMNS)]
+
+    score_chart = svg_line_chart(months, [("健康度总分", site_df['健康度总分'].to_numpy(), '#165DFF')],
+                                 bands=GRADE_BANDS)
+    dim_chart = svg_line_chart(months, [(dim, site_df[col].to_numpy() / weights[dim], color)
+                                        for dim, col, color in zip(DIMENSIONS, SCORE_COLUMNS, DIM_COLORS)])
+    legend = "".join(f'<span style="color:{color}">■ {dim}</span>' for dim, color in zip(DIMENSIONS, DIM_COLORS))
+
+    metric_rows = "".join(
+        f"<tr><td>{metric}</td><td>{latest[metric]:.1f}</td><td>{latest['上期' + metric]:.1f}</td>"
+        f"<td>{_format_change(latest[metric], latest['上期' + metric])}</td></tr>"
+        for metric in REPORT_METRICS)
+    dim_rows = "".join(f"<tr><td>{dim}</td><td>{score:.1f}</td></tr>" for dim, score in zip(DIMENSIONS, dim_scores))
+
+    risks = evaluate_risks(latest)
+    risk_html = "".join(
+        f"<div class='risk{'' if severity == '高' else ' medium'}'><b>{html.escape(risk)}</b>（{severity}风险）"
+        f"<br>{html.escape(detail)}</div>"
+        for risk, detail, severity in risks) or "<p>✅ 未发现重大风险点，当前销售健康状况良好！</p>"
+
+    return f"""<!DOCTYPE html>
+<html lang="zh-CN">
+<head><meta charset="utf-8"><title>{html.escape(title)} - {html.escape(str(site))}</title><style>{STYLE}</style></head>
+<body>
+<h1>{html.escape(title)}</h1>
+<div class="subtitle">{html.escape(company)} | {html.escape(str(site))} | {report_date:%Y-%m-%d} | 数据截至 {latest['月份']:%Y-%m}</div>
+<h2>健康度概览</h2>
+<div class="cards">
+  <div class="card"><div class="label">健康度总分</div><div class="value">{latest['健康度总分']:.1f}</div></div>
+  <div class="card"><div class="label">健康度等级</div><div class="value" style="color:{GRADE_COLORS.get(grade, '#4E5969')}">{grade}</div></div>
+  <div class="card"><div class="label">较上期</div><div class="value">{latest['健康度总分'] - latest['上期健康度总分']:+.1f}</div></div>
+  <div class="card"><div class="label">风险点</div><div class="value">{len(risks)}</div></div>
+</div>
+<h2>健康度总分趋势</h2>
+{score_chart}
+<h2>各维度得分</h2>
+<table><tr><th>维度</th><th>得分</th></tr>{dim_rows}</table>
+<div class="legend">{legend}</div>
+{dim_chart}
+<h2>关键指标</h2>
+<table><tr><th>指标</th><th>本期</th><th>上期</th><th>环比</th></tr>{metric_rows}</table>
+<h2>风险提示</h2>
+{risk_html}
+</body>
+</html>
+"""
+
+
+# 子进程任务：渲染一批站点，返回 [(站点, HTML)]
+def _render_sites(items, title, company, report_date, weights):
+    return [(site, render_site_report(site, site_df, latest, title, company, report_date, weights))
+            for site, site_df, latest in items]
+
+
+# 各站点报告在zip中的文件名：替换非法字符后重名（如 A/B 与 A_B，或仅大小写不同）的依次加序号，
+# index 留给汇总页
+def _report_names(sites):
+    names, used = {}, {'index'}
+    for site in sites:
+        stem = "".join("_" if ch in '\\/:*?"<>|' else ch for ch in str(site))
+        name, suffix = stem, 1
+        while name.lower() in used:
+            suffix += 1
+            name = f"{stem}_{suffix}"
+        used.add(name.lower())
+        names[site] = name + ".html"
+    return names
+
+
+# 并行生成所有站点报告并写入zip，progress(已完成站点数, 站点总数)
+def build_report_bundle(target, results, summary, site_rows, title, company, report_date,
+                        weights=None, jobs=None, progress=None):
+    sites = list(summary.index)
+    names = _report_names(sites)
+    items = [(site, results.iloc[site_rows[site]], summary.loc[site]) for site in sites]
+    tasks = [items[i:i + SITES_PER_TASK] for i in range(0, len(items), SITES_PER_TASK)]
+
+    index_rows = []
+    done = 0
+    # 使用spawn启动子进程，避免在多线程的页面进程中fork
+    with zipfile.ZipFile(target, 'w', compression=zipfile.ZIP_DEFLATED) as bundle, \
+            ProcessPoolExecutor(max_workers=jobs, mp_context=multiprocessing.get_context('spawn')) as pool:
+        futures = [pool.submit(_render_sites, task, title, company, report_date, weights) for task in tasks]
+        for future in as_completed(futures):
+            pages = future.result()
+            for site, page in pages:
+                bundle.writestr(names[site], page)
+            done += len(pages)
+            if progress:
+                progress(done, len(sites))
+
+        for site in sites:
+            latest = summary.loc[site]
+            index_rows.append(f"<tr><td><a href='{html.escape(names[site])}'>{html.escape(str(site))}</a></td>"
+                              f"<td>{latest['健康度总分']:.1f}</td><td>{latest['健康度等级']}</td></tr>")
+        bundle.writestr('index.html', f"""<!DOCTYPE html>
+<html lang="zh-CN">
+<head><meta charset="utf-8"><title>{html.escape(title)}</title><style>{STYLE}</style></head>
+<body>
+<h1>{html.escape(title)}</h1>
+<div class="subtitle">{html.escape(company)} | {report_date:%Y-%m-%d} | 共 {len(sites)} 个数据中心</div>
+<table><tr><th>数据中心</th><th>健康度总分</th><th>健康度等级</th></tr>{''.join(index_rows)}</table>
+</body>
+</html>
+""")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="IDC销售健康度各数据中心批量报告")
+    parser.add_argument('input', help="CSV/XLSX/Parquet/Arrow数据文件")
+    parser.add_argument('-o', '--output', default='reports.zip', help="输出的zip文件")
+    parser.add_argument('-j', '--jobs', type=int, default=None, help="并行进程数")
+    parser.add_argument('--title', default="IDC销售健康度分析报告", help="报告标题")
+    parser.add_argument('--company', default="ABC数据中心", help="公司名称")
+    parser.add_argument('--spec', help="评分规则JSON文件，默认使用内置规则")
+    args = parser.parse_args(argv)
+
+    try:
+        spec = ScoringSpec.load(args.spec) if args.spec else None
+    except (OSError, ScoringSpecError) as e:
+        print(f"评分规则加载失败: {e}", file=sys.stderr)
+        return 1
+    data = read_dataset(args.input)
+    results = join_results(data, score_frame(data, spec=spec))
+    summary, site_rows = summarize_sites(results)
+
+    def report_progress(done, total):
+        print(f"\r已完成 {done}/{total} 个数据中心", end="", file=sys.stderr)
+
+    build_report_bundle(args.output, results, summary, site_rows, args.title, args.company, date.today(),
+                        spec and spec.weights, jobs=args.jobs, progress=report_progress)
+    print(f"\n报告已写入 {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
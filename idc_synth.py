@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+
+from idc_engine import SITE_COLUMN
+
+# 示例数据与可扩展的合成数据生成器，供演示和性能基准使用
+
+# 12个月示例数据
+SAMPLE_DATA = {
+    '服务器利用率': [68, 72, 75, 78, 82, 80, 77, 79, 83, 85, 88, 90],
+    '带宽利用率': [65, 68, 72, 75, 78, 76, 72, 74, 77, 80, 84, 86],
+    '机柜利用率': [75, 78, 82, 85, 88, 86, 83, 84, 87, 89, 91, 93],
+    '新客户数量': [8, 10, 12, 14, 16, 13, 11, 15, 18, 20, 23, 25],
+    '客户流失率': [5.2, 4.8, 4.5, 4.2, 3.8, 4.1, 4.3, 3.9, 3.6, 3.3, 3.0, 2.7],
+    '平均合同期限': [16, 18, 20, 22, 24, 23, 21, 23, 25, 27, 29, 31],
+    '月收入(万元)': [120, 140, 160, 180, 200, 190, 175, 195, 210, 225, 240, 255],
+    '利润率': [25, 27, 29, 31, 33, 32, 30, 32, 34, 36, 38, 40],
+    '应收账款周转天数': [60, 58, 55, 52, 48, 50, 53, 49, 46, 43, 40, 37],
+    '高风险客户占比': [15, 14, 13, 12, 11, 12, 13, 11, 10, 9, 8, 7],
+    '服务中断次数': [3, 3, 2, 2, 1, 2, 2, 1, 1, 0, 0, 0],
+    '市场增长率': [1.2, 1.5, 1.8, 2.0, 2.3, 2.1, 1.9, 2.2, 2.5, 2.7, 3.0, 3.2],
+    '销售漏斗数量': [35, 40, 45, 50, 55, 52, 48, 58, 65, 72, 80, 88]
+}
+
+
+def sample_data():
+    dates = pd.date_range(start='2023-01-01', periods=12, freq=pd.offsets.MonthEnd())
+    return pd.DataFrame({'月份': dates, **SAMPLE_DATA}).astype({col: np.float32 for col in SAMPLE_DATA})
+
+
+# 各指标的站点基线分布 (下限, 上限)、月度趋势 (均值, 标准差)、月度噪声标准差、取值范围
+# 计数类指标按泊松分布抽样
+METRIC_PROFILES = {
+    '服务器利用率': dict(base=(55, 85), trend=(0.3, 0.3), noise=2.5, clip=(0, 100)),
+    '带宽利用率': dict(base=(50, 82), trend=(0.3, 0.3), noise=3.0, clip=(0, 100)),
+    '机柜利用率': dict(base=(65, 92), trend=(0.2, 0.2), noise=1.5, clip=(0, 100)),
+    '新客户数量': dict(base=(5, 25), trend=(0.2, 0.3), poisson=True),
+    '客户流失率': dict(base=(2, 6), trend=(-0.03, 0.05), noise=0.3, clip=(0, 100)),
+    '平均合同期限': dict(base=(12, 30), trend=(0.3, 0.3), noise=1.0, clip=(1, None)),
+    '月收入(万元)': dict(base=(80, 300), trend=(1.5, 1.5), noise=8.0, clip=(0, None)),
+    '利润率': dict(base=(18, 35), trend=(0.1, 0.2), noise=1.2, clip=(-50, 100)),
+    '应收账款周转天数': dict(base=(35, 70), trend=(-0.3, 0.4), noise=2.5, clip=(5, None)),
+    '高风险客户占比': dict(base=(5, 16), trend=(-0.1, 0.15), noise=0.8, clip=(0, 100)),
+    '服务中断次数': dict(base=(0.2, 2.5), trend=(-0.02, 0.05), poisson=True),
+    '市场增长率': dict(base=(0.8, 3.0), trend=(0.03, 0.05), noise=0.2, clip=(None, None)),
+    '销售漏斗数量': dict(base=(30, 80), trend=(1.0, 1.2), poisson=True)
+}
+
+
+# 生成 n_sites 个数据中心 × n_months 个月的长表，按站点、月份排序，逐列生成以控制峰值内存
+def generate_synthetic_data(n_sites=1, n_months=12, seed=0, start='2023-01-01'):
+    rng = np.random.default_rng(seed)
+    months = np.arange(n_months)
+    dates = pd.date_range(start=start, periods=n_months, freq=pd.offsets.MonthEnd())
+
+    columns = {'月份': np.tile(dates.values, n_sites)}
+    for metric, profile in METRIC_PROFILES.items():
+        base = rng.uniform(*profile['base'], size=(n_sites, 1))
+        trend = rng.normal(*profile['trend'], size=(n_sites, 1))
+        level = base + trend * months
+        if profile.get('poisson'):
+            values = rng.poisson(np.clip(level, 0, None)).astype(np.float32)
+        else:
+            values = level + rng.normal(0, profile['noise'], size=(n_sites, n_months))
+            lower, upper = profile['clip']
+            if lower is not None or upper is not None:
+                values = np.clip(values, lower, upper)
+        columns[metric] = values.astype(np.float32).ravel()
+
+    df = pd.DataFrame(columns)
+    if n_sites > 1:
+        names = pd.Index([f"DC{i:05d}" for i in range(n_sites)])
+        df[SITE_COLUMN] = pd.Categorical.from_codes(np.repeat(np.arange(n_sites), n_months), names)
+    return df
@@ -0,0 +1,41 @@
+import pandas as pd
+
+from idc_batch import find_inputs, main
+from idc_synth import generate_synthetic_data
+
+
+# 大写后缀的文件同样被筛选并成功评分
+def test_uppercase_suffixes(tmp_path):
+    input_dir, output_dir = tmp_path / 'in', tmp_path / 'out'
+    input_dir.mkdir()
+    data = generate_synthetic_data(2, 6, seed=1)
+    data.to_csv(input_dir / 'D.CSV', index=False)
+    data.to_excel(input_dir / 'X.XLSX', index=False)
+    (input_dir / 'notes.txt').write_text('skip')
+
+    assert [p.name for p in find_inputs(input_dir)] == ['D.CSV', 'X.XLSX']
+    assert main([str(input_dir), '-o', str(output_dir), '-j', '1']) == 0
+    assert (output_dir / 'D_scored.csv').exists()
+    assert (output_dir / 'X_scored.csv').exists()
+
+
+# 评分汇总每个数据中心一行
+def test_summary_per_site(tmp_path):
+    input_dir, output_dir = tmp_path / 'in', tmp_path / 'out'
+    input_dir.mkdir()
+    generate_synthetic_data(3, 6, seed=2).to_csv(input_dir / 'multi.csv', index=False)
+
+    assert main([str(input_dir), '-o', str(output_dir), '-j', '1']) == 0
+    summary = pd.read_csv(output_dir / '评分汇总.csv')
+    assert len(summary) == 3
+    assert summary['数据中心'].is_unique
+    assert (summary['月数'] == 6).all()
+
+
+# 缺少必要列的文件评分失败，退出状态非零
+def test_failure_exit_code(tmp_path):
+    input_dir, output_dir = tmp_path / 'in', tmp_path / 'out'
+    input_dir.mkdir()
+    generate_synthetic_data(1, 6).drop(columns='利润率').to_csv(input_dir / 'bad.csv', index=False)
+
+    assert main([str(input_dir), '-o', str(output_dir), '-j', '1']) == 1
@@ -0,0 +1,53 @@
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from idc_cache import LRUCache, frame_fingerprint, frame_nbytes
+
+
+def test_lru_evicts_by_bytes():
+    cache = LRUCache(100, sizeof=len)
+    cache.put('a', 'x' * 40)
+    cache.put('b', 'x' * 40)
+    assert cache.get('a') is not None
+    cache.put('c', 'x' * 40)
+    # b 最久未使用，被淘汰
+    assert 'b' not in cache and 'a' in cache and 'c' in cache
+    assert cache.nbytes == 80
+    # 超出预算的单项不缓存，但照常返回
+    assert cache.put('d', 'x' * 200) == 'x' * 200
+    assert 'd' not in cache and cache.nbytes == 80
+
+
+# 同一键的并发请求只创建一次
+def test_get_or_create_once_under_concurrency():
+    cache = LRUCache(1 << 20, sizeof=lambda value: 8)
+    calls = []
+
+    def factory():
+        calls.append(1)
+        time.sleep(0.05)
+        return object()
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_create('k', factory)))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    assert cache.misses >= 1 and cache.hits == 7
+
+
+def test_frame_fingerprint_and_nbytes():
+    df = pd.DataFrame({'a': np.arange(100, dtype=np.float32), 'b': pd.Categorical(['x', 'y'] * 50)})
+    assert frame_fingerprint(df) == frame_fingerprint(df.copy())
+    changed = df.copy()
+    changed.loc[3, 'a'] = -1
+    assert frame_fingerprint(changed) != frame_fingerprint(df)
+    assert frame_fingerprint(df.rename(columns={'a': 'c'})) != frame_fingerprint(df)
+    assert frame_nbytes(df) >= 100 * 4 + 100
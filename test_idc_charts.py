@@ -0,0 +1,47 @@
+import numpy as np
+import plotly.graph_objects as go
+import pytest
+
+from idc_charts import figure_nbytes, lttb_indices, scatter_trace, use_webgl
+
+EMPTY = figure_nbytes(go.Figure())
+
+
+# 热力图z、customdata等数组属性都计入图表大小
+def test_figure_nbytes_counts_array_attributes():
+    z = np.zeros((200, 50))
+    heatmap = figure_nbytes(go.Figure(go.Heatmap(z=z)))
+    assert heatmap - EMPTY >= z.nbytes
+    with_custom = figure_nbytes(go.Figure(go.Heatmap(z=z, customdata=np.zeros((200, 50, 2)))))
+    assert with_custom - heatmap >= 2 * z.nbytes
+
+
+def test_figure_nbytes_scatter_lists():
+    small = figure_nbytes(go.Figure(go.Scatter(x=list(range(10)), y=list(range(10)))))
+    large = figure_nbytes(go.Figure(go.Scatter(x=list(range(1000)), y=list(range(1000)),
+                                               text=[f"第{i}点" for i in range(1000)])))
+    assert large - small >= 16 * 2 * 990
+
+
+def test_lttb_keeps_endpoints_and_extremes():
+    y = np.sin(np.linspace(0, 20, 10_000))
+    y[1234] = 5
+    keep = lttb_indices(np.arange(len(y)), y, 200)
+    assert len(keep) == 200
+    assert keep[0] == 0 and keep[-1] == len(y) - 1
+    assert 1234 in keep
+    assert (np.diff(keep) > 0).all()
+
+
+def test_lttb_skips_missing_values():
+    y = np.arange(10, dtype=float)
+    y[[2, 5]] = np.nan
+    np.testing.assert_array_equal(lttb_indices(np.arange(10), y, 100), [0, 1, 3, 4, 6, 7, 8, 9])
+
+
+@pytest.mark.parametrize('webgl, cls', [(False, go.Scatter), (True, go.Scattergl)])
+def test_scatter_trace_mode(webgl, cls):
+    trace = scatter_trace(webgl, x=[1, 2], y=[3, 4], line=dict(color='var(--primary)'))
+    assert isinstance(trace, cls)
+    assert trace.line.color == ('#165DFF' if webgl else 'var(--primary)')
+    assert use_webgl(10, 5) and not use_webgl(5, 5)
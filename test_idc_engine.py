@@ -0,0 +1,226 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from idc_engine import (DEFAULT_SCORING_SPEC, DEFAULT_SPEC, DEFAULT_WEIGHTS, DIMENSIONS, GRADE_THRESHOLDS,
+                        METRIC_COLUMNS, SCORE_COLUMNS, ScoringSpec, ScoringSpecError, append_scores,
+                        bootstrap_linear_intervals, calculate_health_scores, concat_frames, fit_linear_trends,
+                        forecast_all, forecast_intervals, sample_weights, score_frame, summarize_sites,
+                        weight_sensitivity)
+from idc_synth import generate_synthetic_data
+
+
+@pytest.fixture(scope='module')
+def results():
+    return calculate_health_scores(generate_synthetic_data(20, 12, seed=3))
+
+
+# 闭式均值、标准差与逐抽样暴力计算一致，等级概率与分位数与直接统计一致
+@pytest.mark.parametrize('concentration', [50, None])
+def test_weight_sensitivity_brute_force(results, concentration):
+    W = sample_weights(5000, DEFAULT_WEIGHTS, concentration)
+    sensitivity = weight_sensitivity(results, W)
+    dims = np.nan_to_num(DEFAULT_SPEC.dimension_scores(results[DEFAULT_SPEC.metrics].to_numpy(np.float64)))
+    totals = dims @ W.T
+
+    np.testing.assert_allclose(sensitivity['总分均值'], totals.mean(axis=1), rtol=1e-9)
+    np.testing.assert_allclose(sensitivity['总分标准差'], totals.std(axis=1), rtol=1e-6, atol=1e-9)
+    totals32 = dims.astype(np.float32) @ W.T.astype(np.float32)
+    np.testing.assert_allclose(sensitivity['优秀概率'], (totals32 >= GRADE_THRESHOLDS[0]).mean(axis=1))
+    np.testing.assert_allclose(sensitivity['危险概率'], (totals32 < GRADE_THRESHOLDS[-1]).mean(axis=1))
+    np.testing.assert_allclose(sensitivity[['总分P5', '总分P50', '总分P95']].to_numpy(),
+                               np.quantile(totals32[:, :4000], [0.05, 0.5, 0.95], axis=1).T, rtol=1e-6)
+    probs = sensitivity[['优秀概率', '良好概率', '一般概率', '危险概率']].sum(axis=1)
+    np.testing.assert_allclose(probs, 1)
+
+
+# 指定行位置时只计算这些行，结果与全量计算中的对应行相同
+def test_weight_sensitivity_rows(results):
+    W = sample_weights(2000, DEFAULT_WEIGHTS, 50)
+    rows = [0, 5, len(results) - 1]
+    subset = weight_sensitivity(results, W, rows=rows)
+    assert list(subset.index) == list(results.index[rows])
+    pd.testing.assert_frame_equal(subset, weight_sensitivity(results, W).iloc[rows])
+
+
+# 权重固定时等级稳定概率为1、标准差为0
+def test_weight_sensitivity_fixed_weights(results):
+    W = np.tile(list(DEFAULT_WEIGHTS.values()), (100, 1))
+    sensitivity = weight_sensitivity(results, W)
+    assert (sensitivity['等级稳定概率'] == 1).all()
+    np.testing.assert_allclose(sensitivity['总分标准差'], 0, atol=1e-6)
+    np.testing.assert_allclose(sensitivity['总分均值'], results['健康度总分'], rtol=1e-5)
+
+
+# 逐条路径直接模拟的自助法区间，作为批量矩阵实现的对照
+def _reference_intervals(Y, horizon, n_boot, level, seed):
+    n = Y.shape[1]
+    X = np.column_stack([np.arange(n), np.ones(n)])
+    pinv = np.linalg.pinv(X)
+    coeff = Y @ pinv.T
+    resid = (Y - coeff @ X.T) * np.sqrt(n / (n - 2))
+    rng = np.random.default_rng(seed)
+    draws = rng.integers(0, n, size=(n_boot, n))
+    noise = rng.integers(0, n, size=(n_boot, horizon))
+    steps = np.arange(n, n + horizon)
+    lower, upper = [], []
+    for y, c, r in zip(Y, coeff, resid):
+        boot = (c @ X.T + r[draws]) @ pinv.T
+        paths = boot[:, :1] * steps + boot[:, 1:] + r[noise]
+        lo, hi = np.quantile(paths, [(1 - level) / 2, (1 + level) / 2], axis=0)
+        lower.append(lo)
+        upper.append(hi)
+    return np.array(lower), np.array(upper)
+
+
+@pytest.mark.parametrize('n', [3, 6])
+def test_bootstrap_intervals_reference(n):
+    Y = np.random.default_rng(7).normal(50, 10, size=(40, n))
+    lower, upper = bootstrap_linear_intervals(Y, 12, n_boot=500, level=0.9, seed=1)
+    ref_lower, ref_upper = _reference_intervals(Y, 12, 500, 0.9, 1)
+    np.testing.assert_allclose(lower, ref_lower, atol=1e-3)
+    np.testing.assert_allclose(upper, ref_upper, atol=1e-3)
+    point = fit_linear_trends(Y, 12)
+    assert (lower <= point + 1e-3).all() and (point <= upper + 1e-3).all()
+
+
+# 少于3个点时区间退化为点预测
+def test_bootstrap_intervals_short_history():
+    Y = np.array([[1.0, 3.0], [5.0, 4.0]])
+    lower, upper = bootstrap_linear_intervals(Y, 3)
+    np.testing.assert_array_equal(lower, fit_linear_trends(Y, 3))
+    np.testing.assert_array_equal(upper, lower)
+
+
+# 区间与点预测同索引，并按指标取值范围截断
+def test_forecast_intervals_matches_forecast_all(results):
+    _, site_rows = summarize_sites(results)
+    intervals = forecast_intervals(results, site_rows)
+    forecast = forecast_all(results, site_rows)
+    assert intervals.index.equals(forecast.index)
+    assert (intervals['下限'].to_numpy() <= intervals['上限'].to_numpy()).all()
+    percent = intervals.xs('服务器利用率', level='指标')
+    assert (percent.to_numpy() >= 0).all() and (percent.to_numpy() <= 100).all()
+
+
+def _split_months(data, months):
+    cutoff = data['月份'].sort_values().unique()[-months]
+    return data[data['月份'] < cutoff].reset_index(drop=True), data[data['月份'] >= cutoff].reset_index(drop=True)
+
+
+# 追加新月份的增量评分与全量重算结果一致，包括新出现的站点
+def test_append_scores_matches_full_rescore():
+    data = generate_synthetic_data(4, 18, seed=11)
+    extra = generate_synthetic_data(5, 3, seed=12, start='2024-04-01')
+    extra = extra[extra['数据中心'].astype(str) == 'DC00004']
+    base, new = _split_months(data, 2)
+    new = concat_frames([new, extra])
+
+    results = calculate_health_scores(base.copy())
+    summary, site_rows = summarize_sites(results)
+    merged = append_scores(results, summary, site_rows, new.copy())
+    assert merged is not None
+    combined, merged_summary, merged_rows = merged
+
+    full = calculate_health_scores(concat_frames([base, new]))
+    full_summary, full_rows = summarize_sites(full)
+    pd.testing.assert_frame_equal(merged_summary, full_summary, check_dtype=False, check_categorical=False)
+    assert list(merged_rows) == list(full_rows)
+    assert 'DC00004' in merged_rows and 'DC00004' not in site_rows
+    for site in full_rows:
+        pd.testing.assert_frame_equal(combined.iloc[merged_rows[site]].reset_index(drop=True),
+                                      full.iloc[full_rows[site]].reset_index(drop=True),
+                                      check_categorical=False)
+
+
+# 追加数据包含已有月份时返回None，由调用方全量重算
+def test_append_scores_rejects_existing_months():
+    base, new = _split_months(generate_synthetic_data(2, 12, seed=4), 3)
+    results = calculate_health_scores(base.copy())
+    summary, site_rows = summarize_sites(results)
+    assert append_scores(results, summary, site_rows, concat_frames([base.iloc[[-1]], new])) is None
+
+
+# 原始逐列公式，作为编译后系数矩阵的对照
+def _baseline_scores(df, weights):
+    return pd.DataFrame({
+        '资源利用得分': (df['服务器利用率']*0.4 + df['带宽利用率']*0.4 + df['机柜利用率']*0.2) * weights['资源利用'],
+        '客户健康得分': ((100 - df['客户流失率'])*0.4 + (df['平均合同期限']/36*100)*0.4
+                     + (df['新客户数量']/25*100)*0.2) * weights['客户健康'],
+        '财务健康得分': (df['利润率']*0.5 + (100 - df['应收账款周转天数'])/100*100*0.3
+                     + df['月收入(万元)']/400*100*0.2) * weights['财务健康'],
+        '风险控制得分': ((100 - df['高风险客户占比'])*0.5 + (10 - df['服务中断次数'])/10*100*0.5) * weights['风险控制'],
+        '增长潜力得分': (df['市场增长率']/5*100*0.5 + df['销售漏斗数量']/100*100*0.5) * weights['增长潜力'],
+    }).astype(np.float64)
+
+
+@pytest.mark.parametrize('weights', [None, {'资源利用': 0.1, '客户健康': 0.3, '财务健康': 0.3,
+                                            '风险控制': 0.2, '增长潜力': 0.1}])
+def test_default_spec_matches_baseline_formulas(weights):
+    data = generate_synthetic_data(10, 12, seed=21).astype({col: np.float64 for col in METRIC_COLUMNS})
+    scores = score_frame(data, weights)
+    expected = _baseline_scores(data, weights or DEFAULT_WEIGHTS)
+    np.testing.assert_allclose(scores[SCORE_COLUMNS].to_numpy(np.float64), expected.to_numpy(), rtol=1e-5, atol=1e-4)
+    np.testing.assert_allclose(scores['健康度总分'], expected.sum(axis=1), rtol=1e-5, atol=1e-4)
+    total = expected.sum(axis=1)
+    grades = np.select([total >= 85, total >= 70, total >= 50], ['优秀', '良好', '一般'], default='危险')
+    assert scores['健康度等级'].astype(str).tolist() == grades.tolist()
+
+
+# 维度用到的指标为空时该维度得分为空，其他维度不受影响
+def test_dimension_scores_missing_values():
+    data = generate_synthetic_data(1, 3, seed=2)
+    data.loc[1, '利润率'] = np.nan
+    dims = DEFAULT_SPEC.dimension_scores(data[DEFAULT_SPEC.metrics].to_numpy(np.float64))
+    assert np.isnan(dims[1, DIMENSIONS.index('财务健康')])
+    assert np.isfinite(np.delete(dims, 1, axis=0)).all()
+    assert np.isfinite(np.delete(dims[1], DIMENSIONS.index('财务健康'))).all()
+
+
+def _spec(**changes):
+    spec = json.loads(json.dumps(DEFAULT_SCORING_SPEC))
+    for path, value in changes.items():
+        target = spec
+        *parents, leaf = path.split('__')
+        for key in parents:
+            target = target[int(key) if key.isdigit() else key]
+        target[int(leaf) if leaf.isdigit() else leaf] = value
+    return spec
+
+
+@pytest.mark.parametrize('spec, message', [
+    (_spec(format=2), "格式版本"),
+    (_spec(dimensions={'资源利用': DEFAULT_SCORING_SPEC['dimensions']['资源利用']}), "维度须为"),
+    (_spec(dimensions__资源利用__weight=0.3), "合计为1"),
+    (_spec(dimensions__资源利用__terms__0__metric='未知指标'), "未知指标"),
+    (_spec(dimensions__资源利用__terms__0__range=[5, 5]), "两端不能相同"),
+    (_spec(dimensions__资源利用__terms__0__weight=0.5), "指标项权重合计须为1"),
+])
+def test_spec_validation(spec, message):
+    with pytest.raises(ScoringSpecError, match=message):
+        ScoringSpec(spec)
+
+
+def test_spec_load_errors(tmp_path):
+    with pytest.raises(ScoringSpecError, match="格式错误"):
+        ScoringSpec.load('{"format": 1, "dimensions": ')
+    bad = _spec()
+    del bad['dimensions']['资源利用']['terms'][0]['range']
+    with pytest.raises(ScoringSpecError, match="格式错误"):
+        ScoringSpec.load(json.dumps(bad))
+
+
+# 规则JSON往返后维度顺序、系数与键不变
+def test_spec_round_trip(tmp_path):
+    reordered = _spec()
+    reordered['dimensions'] = dict(reversed(list(reordered['dimensions'].items())))
+    spec = ScoringSpec(reordered)
+    assert spec.key == DEFAULT_SPEC.key
+    path = tmp_path / 'spec.json'
+    path.write_text(spec.to_json(), encoding='utf-8')
+    loaded = ScoringSpec.load(path)
+    assert loaded.key == spec.key
+    np.testing.assert_array_equal(loaded.coef, DEFAULT_SPEC.coef)
+    np.testing.assert_array_equal(loaded.offset, DEFAULT_SPEC.offset)
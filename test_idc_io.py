@@ -0,0 +1,92 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from idc_engine import METRIC_COLUMNS, NON_NUMERIC_ATTR, MissingColumnsError, concat_frames
+from idc_io import read_dataset, to_parquet_bytes
+from idc_synth import generate_synthetic_data
+
+
+@pytest.fixture
+def data():
+    return generate_synthetic_data(3, 12, seed=5)
+
+
+def _write(data, path):
+    suffix = path.suffix.lower()
+    if suffix == '.csv':
+        data.to_csv(path, index=False)
+    elif suffix == '.xlsx':
+        data.to_excel(path, index=False)
+    elif suffix == '.parquet':
+        path.write_bytes(to_parquet_bytes(data))
+    else:
+        data.to_feather(path)
+
+
+# 各格式按后缀（不区分大小写）分派，读出相同的数据
+@pytest.mark.parametrize('name', ['d.csv', 'd.CSV', 'd.xlsx', 'd.XLSX', 'd.parquet', 'd.Parquet',
+                                  'd.feather', 'd.arrow'])
+def test_read_dataset_dispatch(tmp_path, data, name):
+    path = tmp_path / name
+    _write(data, path)
+    df = read_dataset(path)
+    assert list(df.columns) == list(data.columns)
+    assert (df['月份'].to_numpy() == data['月份'].to_numpy()).all()
+    assert df['数据中心'].astype(str).tolist() == data['数据中心'].astype(str).tolist()
+    np.testing.assert_allclose(df[METRIC_COLUMNS].to_numpy(np.float64),
+                               data[METRIC_COLUMNS].to_numpy(np.float64), rtol=1e-6)
+
+
+# 文件对象按传入的文件名分派
+def test_read_dataset_buffer_name(data):
+    buffer = io.BytesIO(data.to_csv(index=False).encode('utf-8'))
+    assert len(read_dataset(buffer, 'upload.Csv')) == len(data)
+
+
+def test_read_dataset_unsupported(tmp_path):
+    with pytest.raises(ValueError, match="不支持的文件格式"):
+        read_dataset(tmp_path / 'd.txt')
+
+
+def test_read_dataset_missing_columns(tmp_path, data):
+    path = tmp_path / 'd.csv'
+    data.drop(columns=['利润率']).to_csv(path, index=False)
+    with pytest.raises(MissingColumnsError):
+        read_dataset(path)
+
+
+# 指标列中的非数值单元格按空值读入，并按列记录数量
+@pytest.mark.parametrize('name', ['d.csv', 'd.xlsx', 'd.parquet'])
+def test_read_dataset_non_numeric(tmp_path, data, name):
+    raw = data.astype({'利润率': object, '服务中断次数': object})
+    raw.loc[[1, 4], '利润率'] = '待定'
+    raw.loc[7, '服务中断次数'] = '三次'
+    raw.loc[8, '服务中断次数'] = None
+    if name.endswith('.parquet'):
+        # Parquet列类型单一，整列写为文本
+        raw = raw.astype({'利润率': str, '服务中断次数': str}).replace('None', None)
+    path = tmp_path / name
+    _write(raw, path)
+
+    df = read_dataset(path)
+    assert df['利润率'].dtype == np.float32
+    assert df['利润率'].isna().sum() == 2
+    assert df['服务中断次数'].isna().sum() == 2
+    assert df.attrs[NON_NUMERIC_ATTR] == {'利润率': 2, '服务中断次数': 1}
+
+
+def test_read_dataset_clean_has_no_marks(tmp_path, data):
+    path = tmp_path / 'd.csv'
+    data.to_csv(path, index=False)
+    assert NON_NUMERIC_ATTR not in read_dataset(path).attrs
+
+
+# 追加数据时各帧的非数值计数相加
+def test_concat_frames_non_numeric(data):
+    first, second = data.iloc[:10].copy(), data.iloc[10:].copy()
+    first.attrs[NON_NUMERIC_ATTR] = {'利润率': 2}
+    second.attrs[NON_NUMERIC_ATTR] = {'利润率': 1, '服务中断次数': 3}
+    assert concat_frames([first, second]).attrs[NON_NUMERIC_ATTR] == {'利润率': 3, '服务中断次数': 3}
@@ -0,0 +1,116 @@
+import numpy as np
+import pandas as pd
+
+from idc_engine import NON_NUMERIC_ATTR
+from idc_profile import SUMMARY_INDEX, QuantileSketch, StreamingSummary, profile_dataset
+from idc_synth import generate_synthetic_data
+
+
+def test_profile_clean_data():
+    profile = profile_dataset(generate_synthetic_data(3, 12, seed=1))
+    assert profile['issues'] == []
+    assert profile['duplicate_months'] == 0 and profile['unordered_months'] == 0
+
+
+# 读取时记录的非数值单元格单独报告，不计入缺失值
+def test_profile_reports_non_numeric():
+    df = generate_synthetic_data(2, 12, seed=1)
+    df.loc[[0, 3], '利润率'] = np.nan
+    df.loc[5, '利润率'] = np.nan
+    df.attrs[NON_NUMERIC_ATTR] = {'利润率': 2}
+    profile = profile_dataset(df)
+    assert profile['columns'].loc['利润率', '非数值'] == 2
+    assert profile['columns'].loc['利润率', '缺失值'] == 1
+    assert ('error', "利润率 含 2 个非数值单元格，已按空值处理") in profile['issues']
+
+
+def test_profile_range_and_counts():
+    df = generate_synthetic_data(1, 12, seed=1)
+    df.loc[0, '服务器利用率'] = 120
+    df.loc[1, '服务中断次数'] = -1
+    df.loc[2, '新客户数量'] = 2.5
+    columns = profile_dataset(df)['columns']
+    assert columns.loc['服务器利用率', '超出范围'] == 1
+    assert columns.loc['服务中断次数', '负值'] == 1
+    assert columns.loc['新客户数量', '非整数'] == 1
+
+
+# 空站点与默认站点一致，重复月份与倒序月份按站点统计
+def test_profile_month_checks():
+    df = generate_synthetic_data(2, 6, seed=1)
+    df['数据中心'] = df['数据中心'].astype(object)
+    df.loc[df['数据中心'] == df['数据中心'].iloc[0], '数据中心'] = None
+    df = pd.concat([df, df.iloc[[0]], df.iloc[[3, 2]]], ignore_index=True)
+    profile = profile_dataset(df)
+    assert profile['duplicate_months'] == 3
+    assert profile['unordered_months'] >= 1
+
+
+def _rank_error(sketch, values, qs):
+    ordered = np.sort(values)
+    estimates = sketch.quantiles(qs)
+    ranks = np.searchsorted(ordered, estimates, side='right') / len(ordered)
+    return np.abs(ranks - np.asarray(qs)).max()
+
+
+QS = np.linspace(0.01, 0.99, 99)
+
+
+# 秩误差约为 1/k 量级，均值、方差、极值精确
+def test_sketch_rank_error():
+    values = np.random.default_rng(0).lognormal(size=500_000)
+    sketch = QuantileSketch(k=512)
+    for start in range(0, len(values), 50_000):
+        sketch.update(values[start:start + 50_000])
+    assert _rank_error(sketch, values, QS) < 0.01
+    assert sketch.count == len(values)
+    assert sketch.min == values.min() and sketch.max == values.max()
+    np.testing.assert_allclose(sketch.mean, values.mean(), rtol=1e-9)
+    np.testing.assert_allclose(sketch.std, values.std(ddof=1), rtol=1e-9)
+    # 内存与数据量无关，保留项约为 3k 个
+    assert sum(len(level) for level in sketch.levels) < 4 * 512
+
+
+# 小数据不压缩，分位数为精确的样本值
+def test_sketch_exact_when_small():
+    values = np.arange(100, dtype=float)
+    sketch = QuantileSketch()
+    sketch.update(values)
+    np.testing.assert_array_equal(sketch.quantiles([0, 0.5, 1]), [0, 49, 99])
+
+
+# 分块构建后合并与整体构建的统计量一致，分位数误差同量级；空值忽略
+def test_sketch_merge():
+    rng = np.random.default_rng(1)
+    values = np.concatenate([rng.normal(0, 1, 300_000), rng.normal(10, 2, 100_000)])
+    values[::1000] = np.nan
+    parts = np.array_split(values, 4)
+    merged = QuantileSketch(k=512)
+    for i, part in enumerate(parts):
+        sketch = QuantileSketch(k=512, seed=i)
+        sketch.update(part)
+        merged.merge(sketch)
+    valid = values[~np.isnan(values)]
+    assert merged.count == len(valid)
+    np.testing.assert_allclose(merged.mean, valid.mean(), rtol=1e-9)
+    np.testing.assert_allclose(merged.std, valid.std(ddof=1), rtol=1e-9)
+    assert _rank_error(merged, valid, QS) < 0.01
+    assert merged.merge(QuantileSketch()).count == len(valid)
+
+
+# 流式摘要与 DataFrame.describe() 同布局：行顺序固定，日期列标准差为空
+def test_streaming_summary_layout():
+    data = generate_synthetic_data(50, 12, seed=3)
+    summary = StreamingSummary()
+    for start in range(0, len(data), 100):
+        summary.update(data.iloc[start:start + 100])
+    describe = summary.describe()
+    expected = data.describe().reindex(SUMMARY_INDEX)
+    assert list(describe.index) == SUMMARY_INDEX == ['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max']
+    assert list(describe.columns) == list(expected.columns)
+    assert pd.isna(describe.loc['std', '月份'])
+    assert describe.loc['min', '月份'] == data['月份'].min()
+    numeric = [col for col in describe.columns if col != '月份']
+    np.testing.assert_allclose(describe.loc[['count', 'mean', 'std', 'min', 'max'], numeric].astype(float),
+                               expected.loc[['count', 'mean', 'std', 'min', 'max'], numeric].astype(float),
+                               rtol=1e-5)
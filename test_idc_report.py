@@ -0,0 +1,57 @@
+import re
+import zipfile
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from idc_engine import calculate_health_scores, summarize_sites
+from idc_report import _report_names, build_report_bundle, svg_line_chart
+from idc_synth import generate_synthetic_data
+
+MONTHS = pd.date_range('2023-01-01', periods=6, freq=pd.offsets.MonthEnd())
+
+
+def _polylines(svg):
+    return re.findall(r'<polyline points="([^"]*)"', svg)
+
+
+def test_svg_line_chart_continuous():
+    svg = svg_line_chart(MONTHS, [("总分", np.arange(6, dtype=float) * 10, '#165DFF')])
+    assert len(_polylines(svg)) == 1
+    assert len(_polylines(svg)[0].split()) == 6
+
+
+# 空值处断开折线，不写入NaN坐标；孤立点画成圆点
+def test_svg_line_chart_splits_at_missing():
+    values = np.array([10, 20, np.nan, 40, np.nan, 60], dtype=float)
+    svg = svg_line_chart(MONTHS, [("总分", values, '#165DFF')])
+    assert 'nan' not in svg.lower()
+    assert [len(points.split()) for points in _polylines(svg)] == [2]
+    assert svg.count('<circle') == 2
+
+
+def test_svg_line_chart_missing_month_label():
+    svg = svg_line_chart(MONTHS.insert(0, pd.NaT)[:6], [("总分", np.arange(6, dtype=float), '#165DFF')])
+    assert 'NaT' not in svg and 'nan' not in svg.lower()
+
+
+# 清理后重名或仅大小写不同的站点各得一个文件名，不覆盖汇总页
+def test_report_names_unique():
+    names = _report_names(['A/B', 'A_B', 'a_b', 'index', 'C:D'])
+    assert names == {'A/B': 'A_B.html', 'A_B': 'A_B_2.html', 'a_b': 'a_b_3.html',
+                     'index': 'index_2.html', 'C:D': 'C_D.html'}
+
+
+def test_build_report_bundle_keeps_every_site(tmp_path):
+    data = generate_synthetic_data(3, 6, seed=1)
+    data['数据中心'] = data['数据中心'].astype(str).map({'DC00000': 'A/B', 'DC00001': 'A_B', 'DC00002': 'index'})
+    results = calculate_health_scores(data)
+    summary, site_rows = summarize_sites(results)
+    target = tmp_path / 'reports.zip'
+    build_report_bundle(target, results, summary, site_rows, "报告", "公司", date(2024, 1, 1), jobs=1)
+    with zipfile.ZipFile(target) as bundle:
+        names = sorted(bundle.namelist())
+        index = bundle.read('index.html').decode('utf-8')
+    assert names == ['A_B.html', 'A_B_2.html', 'index.html', 'index_2.html']
+    assert "index_2.html" in index and "共 3 个数据中心" in index